@@ -69,6 +69,12 @@ JWT_EXPIRATION_HOURS = 24
 DATABASE_PATH = os.getenv("DATABASE_PATH", "./data/bioguard.db")
 VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "./data/chroma_db")
 GRAPH_DB_PATH = os.getenv("GRAPH_DB_PATH", "./data/graph_db")
+ANALYSIS_STORE_PATH = os.getenv("ANALYSIS_STORE_PATH", "./data/analysis_store")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(max(4, os.cpu_count() or 1))))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "30"))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "1024"))
+HISTORY_CACHE_TTL_SECONDS = int(os.getenv("HISTORY_CACHE_TTL_SECONDS", "60"))
 
 # Ensure data directory exists
 os.makedirs(os.path.dirname(DATABASE_PATH) or "./data", exist_ok=True)
@@ -204,7 +210,6 @@ window.addEventListener('beforeinstallprompt', (e) => {
 
 /* Camera access improvements */
 video {
-    transform: scaleX(-1) !important; /* Mirror effect for selfie mode */
     border-radius: 12px !important;
     box-shadow: 0 4px 12px rgba(0,0,0,0.3) !important;
     max-width: 100% !important;
@@ -238,9 +243,14 @@ button, input, select, textarea {
 # ============== Vision & Detection Configuration ==============
 YOLO_MODEL = "yolov8n.pt"  # Nano model for edge deployment
 CONFIDENCE_THRESHOLD = 0.5
-DETECTION_FPS = 1  # Fast-pass detection at 1 FPS
+DETECTION_FPS = float(os.getenv("DETECTION_FPS", "1"))  # Fast-pass detection (and barcode) scans per second
 FRAME_RESIZE_WIDTH = 640
 FRAME_RESIZE_HEIGHT = 480
+# Detection runs on this downsampled copy; boxes are mapped back to the frame
+DETECTION_INPUT_WIDTH = int(os.getenv("DETECTION_INPUT_WIDTH", "320"))
+DETECTION_INPUT_HEIGHT = int(os.getenv("DETECTION_INPUT_HEIGHT", "240"))
+ANALYSIS_MAX_DIM = int(os.getenv("ANALYSIS_MAX_DIM", "512"))  # Long side of frames sent to AI providers
+ANALYSIS_HISTORY_MAX = int(os.getenv("ANALYSIS_HISTORY_MAX", "20"))  # Results kept per session
 
 # ============== AR Overlay Configuration ==============
 AR_BUBBLE_COLOR = (0, 255, 0)  # BGR format (Green)
@@ -249,6 +259,8 @@ AR_TEXT_SCALE = 0.7
 AR_TEXT_THICKNESS = 1
 
 # ============== Knowledge Graph Configuration ==============
+# NetworkX dispatch backend for graph algorithms, e.g. "cugraph" (nx-cugraph)
+GRAPH_BACKEND = os.getenv("GRAPH_BACKEND", "")
 GRAPH_CONFLICT_LEVELS = {
     "low": {"color": "green", "weight": 1},
     "medium": {"color": "yellow", "weight": 5},
@@ -284,6 +296,18 @@ SUPPORTED_LANGUAGES = {
 }
 DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "en")
 
+# ============== AI Providers ==============
+# Selectable analysis engines and their display labels (settings page)
+AI_PROVIDERS = {
+    "gemini": "Gemini Vision",
+    "openai": "OpenAI Vision",
+    "mock": "Mock (offline)",
+}
+AI_PROVIDER_OPTIONS = tuple(AI_PROVIDERS)
+AI_PROVIDER_INDEX = {name: i for i, name in enumerate(AI_PROVIDER_OPTIONS)}
+# Head start for the preferred provider before the fallback is fired in parallel
+AI_PROVIDER_HEDGE_DELAY_SECONDS = float(os.getenv("AI_PROVIDER_HEDGE_DELAY_SECONDS", "2.0"))
+
 # ============== Auto-Translation ==============
 AUTO_TRANSLATE_RESULTS = os.getenv("AUTO_TRANSLATE_RESULTS", "true").lower() == "true"
 TRANSLATION_API_KEY = os.getenv("TRANSLATION_API_KEY", "")  # Google Translate API key
@@ -300,6 +324,22 @@ FEATURE_FLAGS = {
     "digital_twin_enabled": os.getenv("FEATURE_DIGITAL_TWIN_ENABLED", "true").lower() == "true",
     "federated_learning_enabled": FEDERATED_LEARNING_ENABLED,
     "spectral_analysis_enabled": os.getenv("FEATURE_SPECTRAL_ANALYSIS_ENABLED", "true").lower() == "true",
+    # ChromaDB is only needed for similarity queries; off by default
+    "semantic_search_enabled": os.getenv("FEATURE_SEMANTIC_SEARCH_ENABLED", "false").lower() == "true",
+    # Default camera for new sessions; users can still switch in Settings
+    "use_refactored_camera": os.getenv("FEATURE_USE_REFACTORED_CAMERA", "true").lower() == "true",
+}
+
+# ============== Session Defaults ==============
+# Seeded into st.session_state once per session; immutable values only
+SESSION_DEFAULTS = {
+    "user_id": None,
+    "authenticated": False,
+    "user_profile": None,
+    "active_theme": "dark",
+    "ai_provider": "gemini",
+    "use_refactored_camera": FEATURE_FLAGS["use_refactored_camera"],
+    "onboarding_done": False,
 }
 
 # ============== Rate Limiting ==============
@@ -317,11 +357,21 @@ HEALTH_SCORE_THRESHOLDS = {
 
 # ============== WebRTC Configuration ==============
 WEBRTC_CLIENT_TYPE = "webrtc"
+# Every listed STUN server is queried during ICE gathering, so keep one.
+# Set WEBRTC_DISABLE_STUN=true on a LAN to use host candidates only.
+WEBRTC_STUN_URL = os.getenv("WEBRTC_STUN_URL", "stun:stun.l.google.com:19302")
+WEBRTC_DISABLE_STUN = os.getenv("WEBRTC_DISABLE_STUN", "false").lower() == "true"
+WEBRTC_ICE_SERVERS = [] if WEBRTC_DISABLE_STUN else [{"urls": [WEBRTC_STUN_URL]}]
+# Frames are processed and previewed at camera resolution, so cap it at FRAME_RESIZE_*;
+# lower resolution and frame rate cut browser encoder CPU and uplink bandwidth
 WEBRTC_MEDIA_STREAM_CONSTRAINTS = {
     "audio": False,
     "video": {
-        "width": {"ideal": 1280},
-        "height": {"ideal": 720},
+        "width": {"ideal": 480, "max": FRAME_RESIZE_WIDTH},
+        "height": {"ideal": 360, "max": FRAME_RESIZE_HEIGHT},
+        "frameRate": {"ideal": 10, "max": 15},
+        "resizeMode": "crop-and-scale",
+        "facingMode": {"ideal": "environment"},
     }
 }
 
@@ -10,23 +10,288 @@ Provides encrypted data persistence and efficient querying across all tiers.
 """
 
 import sqlite3
+import copy
 import json
+import logging
 import os
+import pickle
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
 import hashlib
+import itertools
 from pathlib import Path
 
 try:
-    import chromadb
+    import orjson
 except ImportError:
-    chromadb = None
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 import networkx as nx
 from app_config.settings import (
-    DATABASE_PATH, VECTOR_DB_PATH, GRAPH_DB_PATH, CACHE_ENABLED, CACHE_TTL_SECONDS
+    DATABASE_PATH, VECTOR_DB_PATH, GRAPH_DB_PATH, ANALYSIS_STORE_PATH, CACHE_ENABLED,
+    CACHE_TTL_SECONDS, DB_POOL_SIZE, DB_TIMEOUT, FEATURE_FLAGS,
+    HISTORY_CACHE_TTL_SECONDS, USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# WAL lets readers proceed while a writer commits; NORMAL sync is safe under WAL
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    f"PRAGMA busy_timeout={int(DB_TIMEOUT * 1000)}",
 )
 
+# Per-connection prepared-statement cache; hot queries below stay resident
+SQL_STATEMENT_CACHE_SIZE = 256
+
+# Hot-path statements, kept as constants so every call hits the statement cache
+SQL_INSERT_USER = """
+    INSERT OR REPLACE INTO users
+    (user_id, name, email, picture, provider, email_verified,
+     age, weight, height, health_sync_enabled, region, preferred_sources,
+     created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_SELECT_USER = """
+    SELECT user_id, name, email, picture, provider, email_verified,
+           age, weight, height, health_sync_enabled, region, preferred_sources
+    FROM users
+    WHERE user_id = ?
+"""
+
+# Profile list fields live in side tables, one row per item: field -> table
+USER_LIST_TABLES = {
+    "allergies": "user_allergies",
+    "medical_conditions": "user_medical_conditions",
+    "dietary_preferences": "user_dietary_preferences",
+}
+
+SQL_USER_LIST_WRITES = {
+    field: (
+        f"DELETE FROM {table} WHERE user_id = ?",
+        f"INSERT INTO {table} (user_id, position, value) VALUES (?, ?, ?)",
+    )
+    for field, table in USER_LIST_TABLES.items()
+}
+
+SQL_SELECT_USER_LISTS = " UNION ALL ".join(
+    f"SELECT '{field}' AS field, position, value FROM {table} WHERE user_id = :user_id"
+    for field, table in USER_LIST_TABLES.items()
+) + " ORDER BY field, position"
+
+SQL_INSERT_FA = """
+    INSERT INTO food_analysis
+    (user_id, product, health_score, nova_score, verdict, raw_data, data_source, nutrients, barcode, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_SELECT_HISTORY = """
+    SELECT product, health_score, nova_score, verdict, created_at
+    FROM food_analysis
+    WHERE user_id = ?
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+SQL_INSERT_FL = """
+    INSERT INTO fl_updates (client_id, model_weights, accuracy, update_timestamp)
+    VALUES (?, ?, ?, ?)
+"""
+
+SQL_SELECT_NUTRITION_CACHE = "SELECT payload, created_at FROM nutrition_cache WHERE cache_key = ?"
+
+SQL_UPSERT_NUTRITION_CACHE = """
+    INSERT OR REPLACE INTO nutrition_cache
+    (cache_key, payload, source, source_url, confidence, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Ingredient -> Health Impact relationships seeded into the knowledge graph
+HEALTH_GRAPH_SEED = (
+    ("sodium", "hypertension", "increases_risk", "high"),
+    ("sodium", "blood_pressure", "increases", "high"),
+    ("sugar", "diabetes", "increases_risk", "high"),
+    ("sugar", "glucose_spike", "causes", "high"),
+    ("saturated_fat", "cholesterol", "increases", "high"),
+    ("preservatives", "digestive_health", "harms", "medium"),
+    ("artificial_colors", "hyperactivity", "may_trigger", "low"),
+    ("gluten", "celiac_disease", "triggers", "high"),
+    ("lactose", "lactose_intolerance", "triggers", "high"),
+    ("peanuts", "peanut_allergy", "triggers", "high"),
+    ("trans_fat", "heart_disease", "increases_risk", "high"),
+)
+
+# Timestamps are stored as integer microseconds since the Unix epoch (UTC).
+# Databases below this user_version still hold ISO strings and are migrated.
+SCHEMA_VERSION_INT_TIMESTAMPS = 1
+# Databases below this user_version keep profile lists as JSON in users
+SCHEMA_VERSION_PROFILE_TABLES = 2
+TIMESTAMP_COLUMNS = (
+    ("users", "created_at"),
+    ("users", "updated_at"),
+    ("food_analysis", "created_at"),
+    ("nutrition_cache", "created_at"),
+    ("medical_files", "uploaded_at"),
+    ("fl_updates", "update_timestamp"),
+)
+
+# Pickled seeded graph, rebuilt whenever HEALTH_GRAPH_SEED changes
+GRAPH_SNAPSHOT_FILE = "health_graph.pkl"
+
+# Background document-store ingest: flush at this many docs or after this long
+VECTOR_BATCH_SIZE = 32
+VECTOR_BATCH_WAIT_SECONDS = 0.25
+VECTOR_QUEUE_MAXSIZE = 1024
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize ``obj`` to a JSON string, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+def _loads(data: str) -> Any:
+    """Parse a JSON string, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _now_us() -> int:
+    """Current UTC time as integer microseconds since the Unix epoch."""
+    return time.time_ns() // 1000
+
+
+def _iso_from_us(timestamp_us: Optional[int]) -> Optional[str]:
+    """Render a stored microsecond timestamp as the naive-UTC ISO string the API returns."""
+    if timestamp_us is None:
+        return None
+    return datetime.utcfromtimestamp(timestamp_us / 1_000_000).isoformat()
+
+
+def _profile_list_values(items: Optional[List[Any]]) -> List[str]:
+    """Profile list items as stored in the side tables: nulls dropped, rest as text."""
+    return [str(item) for item in items or () if item is not None]
+
+
+def _doc_id(key: str) -> str:
+    """Return a 128-bit hex document id for ``key`` (xxh3, else BLAKE2b)."""
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(key)
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class _ConnectionPool:
+    """Bounded pool of long-lived SQLite connections shared across threads."""
+
+    def __init__(self, db_path: str, size: int, timeout: float):
+        """
+        Open ``size`` connections up front.
+
+        Args:
+            db_path: SQLite database file path
+            size: Number of pooled connections
+            timeout: Seconds to wait on a locked database
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        # Every ":memory:" connection is its own private database, so share one
+        if db_path == ":memory:":
+            size = 1
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new autocommit connection usable from any thread."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=SQL_STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        # PRAGMAs are per-connection state, so apply them to every pooled handle
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection, rolling back any open transaction on error."""
+        conn = self._pool.get()
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        """Close every idle connection in the pool."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class _UserCache:
+    """Thread-safe LRU cache of per-user entries with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached profile, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, profile = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # Callers may mutate the profile (e.g. list fields), so never hand out ours
+        return copy.deepcopy(profile)
+
+    def put(self, user_id: str, profile: Dict[str, Any]) -> None:
+        """Cache a copy of ``profile``, evicting the least recently used entry."""
+        profile = copy.deepcopy(profile)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, profile)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, user_id: str) -> None:
+        """Drop ``user_id`` from the cache."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
 
 class DBManager:
     """Unified database manager for hybrid storage architecture."""
@@ -36,27 +301,100 @@ class DBManager:
         self.db_path = DATABASE_PATH
         self.vector_db_path = VECTOR_DB_PATH
         self.graph_db_path = GRAPH_DB_PATH
+        self.analysis_store_path = ANALYSIS_STORE_PATH
+        self._pool = _ConnectionPool(self.db_path, DB_POOL_SIZE, DB_TIMEOUT)
+        self._user_cache = _UserCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+        # Per user: {'limit': n, 'rows': [...]} from the widest recent history read
+        self._history_cache = _UserCache(USER_CACHE_MAX_ENTRIES, HISTORY_CACHE_TTL_SECONDS)
         
         # Initialize SQLite
         self._init_sqlite()
         
-        # Initialize Vector DB (Chroma) - for semantic search
-        if chromadb:
-            self.chroma_client = chromadb.PersistentClient(path=VECTOR_DB_PATH)
-            self.food_collection = self.chroma_client.get_or_create_collection(
-                name="food_analysis"
-            )
-        else:
-            self.chroma_client = None
-            self.food_collection = None
+        # Analysis document store, opened on first use: ChromaDB when semantic
+        # search is enabled, otherwise a plain disk-backed key-value cache
+        self._chroma_client = None
+        self._food_collection = None
+        self._analysis_store = None
+        self._chroma_checked = False
+        self._chroma_lock = threading.Lock()
+        
+        # Documents are written by a background thread, started on first save
+        self._vector_queue: "queue.Queue[tuple]" = queue.Queue(maxsize=VECTOR_QUEUE_MAXSIZE)
+        self._vector_writer: Optional[threading.Thread] = None
+        self._vector_writer_lock = threading.Lock()
+        self._doc_seq = itertools.count()
         
         # Initialize Graph DB (NetworkX) - for relationship mapping
         self._init_graph()
     
+    @property
+    def chroma_client(self):
+        """ChromaDB client, or None if chromadb is not installed."""
+        self._ensure_vector_db()
+        return self._chroma_client
+
+    @property
+    def food_collection(self):
+        """ChromaDB ``food_analysis`` collection, or None if unavailable."""
+        self._ensure_vector_db()
+        return self._food_collection
+
+    @property
+    def analysis_store(self):
+        """diskcache store of analysis documents, or None if unavailable."""
+        self._ensure_vector_db()
+        return self._analysis_store
+
+    def _ensure_vector_db(self) -> None:
+        """Open the configured analysis document store on first access."""
+        if self._chroma_checked:
+            return
+        with self._chroma_lock:
+            if self._chroma_checked:
+                return
+            if not FEATURE_FLAGS.get("semantic_search_enabled"):
+                self._open_analysis_store()
+                self._chroma_checked = True
+                return
+            try:
+                import chromadb
+            except ImportError:
+                chromadb = None
+            if chromadb:
+                try:
+                    self._chroma_client = chromadb.PersistentClient(path=self.vector_db_path)
+                    self._food_collection = self._chroma_client.get_or_create_collection(
+                        name="food_analysis"
+                    )
+                except Exception as e:
+                    logger.warning("⚠️ Warning: Could not open vector DB: %s", e)
+                    self._chroma_client = None
+                    self._food_collection = None
+            self._chroma_checked = True
+
+    def _open_analysis_store(self) -> None:
+        """Open the diskcache key-value store used when semantic search is off."""
+        try:
+            import diskcache
+        except ImportError:
+            return
+        try:
+            self._analysis_store = diskcache.Cache(self.analysis_store_path)
+        except Exception as e:
+            logger.warning("⚠️ Warning: Could not open analysis store: %s", e)
+            self._analysis_store = None
+
+    def _conn(self):
+        """Borrow a pooled SQLite connection as a context manager."""
+        return self._pool.connection()
+
     def _init_sqlite(self):
         """Initialize SQLite database with schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._conn() as conn:
+            self._create_schema(conn.cursor())
+
+    def _create_schema(self, cursor: sqlite3.Cursor) -> None:
+        """Create tables and backfill columns added after the first release."""
         
         # Users table - Updated with OAuth fields
         cursor.execute("""
@@ -76,8 +414,8 @@ class DBManager:
                 health_sync_enabled BOOLEAN DEFAULT 0,
                 region TEXT,
                 preferred_sources TEXT,
-                created_at TIMESTAMP,
-                updated_at TIMESTAMP
+                created_at INTEGER,
+                updated_at INTEGER
             )
         """)
         
@@ -94,7 +432,7 @@ class DBManager:
                 data_source TEXT,
                 nutrients TEXT,
                 barcode TEXT,
-                created_at TIMESTAMP,
+                created_at INTEGER,
                 FOREIGN KEY (user_id) REFERENCES users(user_id)
             )
         """)
@@ -107,7 +445,7 @@ class DBManager:
                 source TEXT,
                 source_url TEXT,
                 confidence REAL,
-                created_at TIMESTAMP
+                created_at INTEGER
             )
         """)
 
@@ -127,7 +465,7 @@ class DBManager:
                 file_name TEXT,
                 content TEXT,
                 file_type TEXT,
-                uploaded_at TIMESTAMP,
+                uploaded_at INTEGER,
                 FOREIGN KEY (user_id) REFERENCES users(user_id)
             )
         """)
@@ -139,29 +477,136 @@ class DBManager:
                 client_id TEXT,
                 model_weights TEXT,
                 accuracy REAL,
-                update_timestamp TIMESTAMP
+                update_timestamp INTEGER
+            )
+        """)
+
+        # Profile list side tables; the (value, user_id) index answers
+        # "which users have X" lookups without touching the base table
+        for table in USER_LIST_TABLES.values():
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    user_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (user_id, position)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_value ON {table}(value, user_id)"
             )
+        
+        self._migrate_timestamps(cursor)
+        self._migrate_profile_lists(cursor)
+        
+        # Serve get_user_history as an index range scan instead of scan + sort
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_fa_user_created
+            ON food_analysis(user_id, created_at DESC)
         """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_mf_user ON medical_files(user_id)")
         
-        conn.commit()
-        conn.close()
+        # Refresh planner statistics; analysis_limit keeps this cheap on large tables
+        cursor.execute("PRAGMA analysis_limit=1000")
+        cursor.execute("ANALYZE")
+
+    def _migrate_timestamps(self, cursor: sqlite3.Cursor) -> None:
+        """Convert ISO-string timestamps from older installs to integer microseconds."""
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] >= SCHEMA_VERSION_INT_TIMESTAMPS:
+            return
+        for table, column in TIMESTAMP_COLUMNS:
+            cursor.execute(f"""
+                UPDATE {table}
+                SET {column} = CAST(ROUND((julianday({column}) - 2440587.5) * 86400000000) AS INTEGER)
+                WHERE typeof({column}) = 'text'
+            """)
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION_INT_TIMESTAMPS}")
+
+    def _migrate_profile_lists(self, cursor: sqlite3.Cursor) -> None:
+        """Move JSON-encoded profile lists from users into their side tables."""
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] >= SCHEMA_VERSION_PROFILE_TABLES:
+            return
+        cursor.execute("BEGIN IMMEDIATE")
+        for field, table in USER_LIST_TABLES.items():
+            # Same normalization as _profile_list_values: nulls dropped,
+            # positions renumbered without gaps, values stored as text
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO {table} (user_id, position, value)
+                SELECT users.user_id,
+                       ROW_NUMBER() OVER (PARTITION BY users.user_id ORDER BY item.key) - 1,
+                       CASE item.type
+                           WHEN 'true' THEN 'True'
+                           WHEN 'false' THEN 'False'
+                           ELSE CAST(item.value AS TEXT)
+                       END
+                FROM users, json_each(users.{field}) AS item
+                WHERE json_valid(users.{field}) AND json_type(users.{field}) = 'array'
+                  AND item.type != 'null'
+            """)
+            cursor.execute(f"UPDATE users SET {field} = NULL")
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION_PROFILE_TABLES}")
+        cursor.execute("COMMIT")
 
     def _add_column_if_missing(self, cursor: sqlite3.Cursor, table: str, column: str, definition: str) -> None:
         """Add a column to a table if it does not already exist."""
         cursor.execute(f"PRAGMA table_info({table})")
-        existing = {row[1] for row in cursor.fetchall()}
+        existing = {row['name'] for row in cursor.fetchall()}
         if column not in existing:
             cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
     
     def _init_graph(self):
         """Initialize knowledge graph for ingredient-health relationships."""
         self.graph = nx.DiGraph()
+        # ingredient -> [(condition, condition_lower, relationship, severity)]
+        self._ingredient_edges: Dict[str, List[tuple]] = {}
+        
+        if self._load_graph_snapshot():
+            return
         
         # Pre-populate with common health relationships
         self._populate_health_graph()
         
         # Save to file
-        os.makedirs(self.graph_db_path, exist_ok=True)
+        self._save_graph_snapshot()
+
+    @property
+    def _graph_snapshot_path(self) -> str:
+        """Location of the pickled seeded graph."""
+        return os.path.join(self.graph_db_path, GRAPH_SNAPSHOT_FILE)
+
+    def _load_graph_snapshot(self) -> bool:
+        """Restore the seeded graph from disk if it was built from the current seed."""
+        try:
+            with open(self._graph_snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False
+        if not isinstance(snapshot, dict) or snapshot.get('seed') != HEALTH_GRAPH_SEED:
+            return False
+        self.graph = snapshot['graph']
+        self._ingredient_edges = snapshot['ingredient_edges']
+        return True
+
+    def _save_graph_snapshot(self) -> None:
+        """Pickle the seeded graph so later startups can skip re-population."""
+        try:
+            os.makedirs(self.graph_db_path, exist_ok=True)
+            tmp_path = f"{self._graph_snapshot_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(
+                    {
+                        'seed': HEALTH_GRAPH_SEED,
+                        'graph': self.graph,
+                        'ingredient_edges': self._ingredient_edges,
+                    },
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_path, self._graph_snapshot_path)
+        except OSError as e:
+            logger.warning("⚠️ Warning: Could not save knowledge graph snapshot: %s", e)
     
     def _populate_health_graph(self):
         """
@@ -170,27 +615,29 @@ class DBManager:
         Each edge represents a connection between an ingredient and a health condition,
         with metadata for relationship type and severity level.
         """
-        # Ingredient -> Health Impact relationships
-        conflicts = [
-            ("sodium", "hypertension", "increases_risk", "high"),
-            ("sodium", "blood_pressure", "increases", "high"),
-            ("sugar", "diabetes", "increases_risk", "high"),
-            ("sugar", "glucose_spike", "causes", "high"),
-            ("saturated_fat", "cholesterol", "increases", "high"),
-            ("preservatives", "digestive_health", "harms", "medium"),
-            ("artificial_colors", "hyperactivity", "may_trigger", "low"),
-            ("gluten", "celiac_disease", "triggers", "high"),
-            ("lactose", "lactose_intolerance", "triggers", "high"),
-            ("peanuts", "peanut_allergy", "triggers", "high"),
-            ("trans_fat", "heart_disease", "increases_risk", "high"),
-        ]
+        for source, target, relationship, severity in HEALTH_GRAPH_SEED:
+            self.add_graph_edge(source, target, relationship, severity)
+
+    def add_graph_edge(self, source: str, target: str, relationship: str, severity: str) -> None:
+        """
+        Add an ingredient -> condition edge to the graph and its lookup index.
         
-        for source, target, relationship, severity in conflicts:
-            self.graph.add_edge(
-                source, target,
-                relationship=relationship,
-                severity=severity
-            )
+        Args:
+            source: Normalized ingredient node
+            target: Health condition node
+            relationship: Relationship type (e.g. ``increases_risk``)
+            severity: Severity level (low, medium, high)
+        """
+        self.graph.add_edge(
+            source, target,
+            relationship=relationship,
+            severity=severity
+        )
+        edges = [
+            edge for edge in self._ingredient_edges.get(source, []) if edge[0] != target
+        ]
+        edges.append((target, target.lower(), relationship, severity))
+        self._ingredient_edges[source] = edges
     
     def save_user(self, user_data: Dict[str, Any]) -> bool:
         """
@@ -203,46 +650,51 @@ class DBManager:
             True if successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO users 
-                (user_id, name, email, picture, provider, email_verified,
-                 age, weight, height, allergies, medical_conditions, 
-                 dietary_preferences, health_sync_enabled, region, preferred_sources,
-                 created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                user_data['user_id'],
-                user_data.get('name'),
-                user_data.get('email'),
-                user_data.get('picture'),
-                user_data.get('provider', 'traditional'),
-                user_data.get('email_verified', False),
-                user_data.get('age'),
-                user_data.get('weight'),
-                user_data.get('height'),
-                json.dumps(user_data.get('allergies', [])),
-                json.dumps(user_data.get('medical_conditions', [])),
-                json.dumps(user_data.get('dietary_preferences', [])),
-                bool(user_data.get('health_sync_enabled', False)),
-                user_data.get('region'),
-                json.dumps(user_data.get('preferred_sources', [])),
-                datetime.utcnow().isoformat(),
-                datetime.utcnow().isoformat(),
-            ))
+            # Build all parameters before taking the write lock
+            get = user_data.get
+            user_id = user_data['user_id']
+            now = _now_us()
+            params = (
+                user_id,
+                get('name'),
+                get('email'),
+                get('picture'),
+                get('provider', 'traditional'),
+                get('email_verified', False),
+                get('age'),
+                get('weight'),
+                get('height'),
+                bool(get('health_sync_enabled', False)),
+                get('region'),
+                _dumps(get('preferred_sources', [])),
+                now,
+                now,
+            )
+            list_rows = [
+                (delete_sql, insert_sql, [
+                    (user_id, position, value)
+                    for position, value in enumerate(_profile_list_values(get(field)))
+                ])
+                for field, (delete_sql, insert_sql) in SQL_USER_LIST_WRITES.items()
+            ]
             
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(SQL_INSERT_USER, params)
+                for delete_sql, insert_sql, rows in list_rows:
+                    conn.execute(delete_sql, (user_id,))
+                    if rows:
+                        conn.executemany(insert_sql, rows)
+                conn.commit()
+            self._user_cache.pop(user_id)
             return True
-        except Exception as e:
-            print(f"❌ Error saving user: {e}")
+        except Exception:
+            logger.exception("❌ Error saving user")
             return False
     
     def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
-        Retrieve user profile from database.
+        Retrieve user profile, served from an in-process TTL cache when possible.
         
         Args:
             user_id: Unique user identifier
@@ -250,35 +702,47 @@ class DBManager:
         Returns:
             User data dictionary or None if not found
         """
+        user = self._user_cache.get(user_id)
+        if user is None:
+            user = self._get_user_uncached(user_id)
+            if user is not None:
+                self._user_cache.put(user_id, user)
+        return user
+
+    def _get_user_uncached(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Load a user profile straight from SQLite."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-            row = cursor.fetchone()
-            conn.close()
+            with self._conn() as conn:
+                row = conn.execute(SQL_SELECT_USER, (user_id,)).fetchone()
+                list_rows = (
+                    conn.execute(SQL_SELECT_USER_LISTS, {'user_id': user_id}).fetchall()
+                    if row else []
+                )
             
             if row:
+                lists: Dict[str, List[Any]] = {field: [] for field in USER_LIST_TABLES}
+                for list_row in list_rows:
+                    lists[list_row['field']].append(list_row['value'])
                 return {
-                    'user_id': row[0],
-                    'name': row[1],
-                    'email': row[2],
-                    'picture': row[3],
-                    'provider': row[4],
-                    'email_verified': row[5],
-                    'age': row[6],
-                    'weight': row[7],
-                    'height': row[8],
-                    'allergies': json.loads(row[9] or '[]'),
-                    'medical_conditions': json.loads(row[10] or '[]'),
-                    'dietary_preferences': json.loads(row[11] or '[]'),
-                    'health_sync_enabled': bool(row[12]) if len(row) > 12 else False,
-                    'region': row[13] if len(row) > 13 else None,
-                    'preferred_sources': json.loads(row[14] or '[]') if len(row) > 14 else [],
+                    'user_id': row['user_id'],
+                    'name': row['name'],
+                    'email': row['email'],
+                    'picture': row['picture'],
+                    'provider': row['provider'],
+                    'email_verified': row['email_verified'],
+                    'age': row['age'],
+                    'weight': row['weight'],
+                    'height': row['height'],
+                    'allergies': lists['allergies'],
+                    'medical_conditions': lists['medical_conditions'],
+                    'dietary_preferences': lists['dietary_preferences'],
+                    'health_sync_enabled': bool(row['health_sync_enabled']),
+                    'region': row['region'],
+                    'preferred_sources': _loads(row['preferred_sources'] or '[]'),
                 }
             return None
-        except Exception as e:
-            print(f"❌ Error retrieving user: {e}")
+        except Exception:
+            logger.exception("❌ Error retrieving user")
             return None
 
     def update_user_settings(
@@ -290,41 +754,37 @@ class DBManager:
     ) -> bool:
         """Update user nutrition/health-sync settings."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            updates = []
-            params: List[Any] = []
-
-            if health_sync_enabled is not None:
-                updates.append("health_sync_enabled = ?")
-                params.append(bool(health_sync_enabled))
+            with self._conn() as conn:
+                updates = []
+                params: List[Any] = []
 
-            if region is not None:
-                updates.append("region = ?")
-                params.append(region)
+                if health_sync_enabled is not None:
+                    updates.append("health_sync_enabled = ?")
+                    params.append(bool(health_sync_enabled))
 
-            if preferred_sources is not None:
-                updates.append("preferred_sources = ?")
-                params.append(json.dumps(preferred_sources))
+                if region is not None:
+                    updates.append("region = ?")
+                    params.append(region)
 
-            if not updates:
-                return True
+                if preferred_sources is not None:
+                    updates.append("preferred_sources = ?")
+                    params.append(_dumps(preferred_sources))
 
-            updates.append("updated_at = ?")
-            params.append(datetime.utcnow().isoformat())
-            params.append(user_id)
+                if not updates:
+                    return True
 
-            cursor.execute(
-                f"UPDATE users SET {', '.join(updates)} WHERE user_id = ?",
-                params,
-            )
+                updates.append("updated_at = ?")
+                params.append(_now_us())
+                params.append(user_id)
 
-            conn.commit()
-            conn.close()
+                conn.execute(
+                    f"UPDATE users SET {', '.join(updates)} WHERE user_id = ?",
+                    params,
+                )
+            self._user_cache.pop(user_id)
             return True
-        except Exception as e:
-            print(f"❌ Error updating user settings: {e}")
+        except Exception:
+            logger.exception("❌ Error updating user settings")
             return False
     
     def save_food_analysis(self, user_id: str, analysis_data: Dict[str, Any]) -> bool:
@@ -338,70 +798,77 @@ class DBManager:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Extract numeric values properly
-            health_score = analysis_data.get('health_score', 0)
-            nova_score = analysis_data.get('nova_score', 0)
-            
-            # Ensure numeric types
-            if isinstance(health_score, str):
-                health_score = int(health_score) if health_score.isdigit() else 0
-            if isinstance(nova_score, str):
-                nova_score = int(nova_score) if nova_score.isdigit() else 0
+        return self.save_food_analyses_batch(user_id, [analysis_data])
+
+    def save_food_analyses_batch(self, user_id: str, analyses: List[Dict[str, Any]]) -> bool:
+        """
+        Save several food analysis results in a single transaction.
+        
+        Args:
+            user_id: User identifier
+            analyses: Analysis result dictionaries, as accepted by save_food_analysis
             
-            cursor.execute("""
-                INSERT INTO food_analysis 
-                (user_id, product, health_score, nova_score, verdict, raw_data, data_source, nutrients, barcode, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                user_id,
-                analysis_data.get('product', 'Unknown'),  # Changed from 'name' to 'product'
-                int(health_score),  # Ensure INTEGER type
-                int(nova_score),    # Ensure INTEGER type
-                analysis_data.get('verdict', 'UNKNOWN'),
-                json.dumps(analysis_data),
-                analysis_data.get('data_source') or analysis_data.get('source'),
-                json.dumps(analysis_data.get('nutrients', {})),
-                analysis_data.get('barcode'),
-                datetime.utcnow().isoformat(),
-            ))
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            # Serialize outside the transaction to keep the write lock short
+            rows = [self._food_analysis_row(user_id, data) for data in analyses]
             
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(SQL_INSERT_FA, rows)
+                conn.commit()
+            self._history_cache.pop(user_id)
             
-            # Also add to vector DB if available
-            if self.food_collection:
+            # Also add to the analysis document store if available
+            for analysis_data in analyses:
                 self._add_to_vector_db(analysis_data)
             
             return True
-        except Exception as e:
-            print(f"❌ Error saving food analysis: {e}")
+        except Exception:
+            logger.exception("❌ Error saving food analysis")
             return False
 
+    @staticmethod
+    def _food_analysis_row(user_id: str, analysis_data: Dict[str, Any]) -> tuple:
+        """Build the food_analysis insert parameters for one analysis result."""
+        # Extract numeric values properly
+        health_score = analysis_data.get('health_score', 0)
+        nova_score = analysis_data.get('nova_score', 0)
+        
+        # Ensure numeric types
+        if isinstance(health_score, str):
+            health_score = int(health_score) if health_score.isdigit() else 0
+        if isinstance(nova_score, str):
+            nova_score = int(nova_score) if nova_score.isdigit() else 0
+        
+        return (
+            user_id,
+            analysis_data.get('product', 'Unknown'),  # Changed from 'name' to 'product'
+            int(health_score),  # Ensure INTEGER type
+            int(nova_score),    # Ensure INTEGER type
+            analysis_data.get('verdict', 'UNKNOWN'),
+            _dumps(analysis_data),
+            analysis_data.get('data_source') or analysis_data.get('source'),
+            _dumps(analysis_data.get('nutrients', {})),
+            analysis_data.get('barcode'),
+            _now_us(),
+        )
+
     def get_cached_nutrition(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """Return cached nutrition payload if within TTL."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT payload, created_at FROM nutrition_cache WHERE cache_key = ?",
-                (cache_key,),
-            )
-            row = cursor.fetchone()
-            conn.close()
+            with self._conn() as conn:
+                row = conn.execute(SQL_SELECT_NUTRITION_CACHE, (cache_key,)).fetchone()
             if not row:
                 return None
-            payload, created_at = row
-            created_ts = datetime.fromisoformat(created_at)
-            age_seconds = (datetime.utcnow() - created_ts).total_seconds()
+            age_seconds = (_now_us() - row['created_at']) / 1_000_000
             if age_seconds > CACHE_TTL_SECONDS:
                 return None
-            return json.loads(payload)
+            return _loads(row['payload'])
         except Exception as exc:
-            print(f"⚠️ Cache read failed: {exc}")
+            logger.warning("⚠️ Cache read failed: %s", exc)
             return None
 
     def save_nutrition_cache(
@@ -411,39 +878,35 @@ class DBManager:
     ) -> None:
         """Persist nutrition payload for offline-like experience."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO nutrition_cache
-                (cache_key, payload, source, source_url, confidence, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    cache_key,
-                    json.dumps(payload),
-                    payload.get("source"),
-                    payload.get("source_url"),
-                    payload.get("confidence"),
-                    datetime.utcnow().isoformat(),
-                ),
-            )
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                conn.execute(
+                    SQL_UPSERT_NUTRITION_CACHE,
+                    (
+                        cache_key,
+                        _dumps(payload),
+                        payload.get("source"),
+                        payload.get("source_url"),
+                        payload.get("confidence"),
+                        _now_us(),
+                    ),
+                )
         except Exception as exc:
-            print(f"⚠️ Cache write failed: {exc}")
+            logger.warning("⚠️ Cache write failed: %s", exc)
     
     def _add_to_vector_db(self, analysis_data: Dict[str, Any]):
         """
-        Add food analysis to ChromaDB vector database for semantic search.
+        Queue food analysis for the analysis document store.
+        
+        Goes to ChromaDB when semantic search is enabled; otherwise the
+        document and metadata are kept in the diskcache key-value store,
+        which skips embedding and index maintenance on every save. Writes
+        happen on a background thread in batches, so saving an analysis
+        never waits on the store.
         
         Args:
             analysis_data: Analysis results to be embedded and stored
         """
         try:
-            if not self.food_collection:
-                return
-            
             product_name = analysis_data.get('product', analysis_data.get('name', 'Unknown'))
             
             text_content = f"""
@@ -454,21 +917,76 @@ class DBManager:
             Clinical Verdict: {analysis_data.get('clinical_verdict', '')}
             """
             
-            doc_id = hashlib.md5(
-                f"{product_name}-{datetime.utcnow()}".encode()
-            ).hexdigest()
-            
-            self.food_collection.add(
-                ids=[doc_id],
-                documents=[text_content],
-                metadatas=[{
-                    'product': product_name,  # Changed from 'product_name' for consistency
-                    'health_score': analysis_data.get('health_score', 0),
-                    'verdict': analysis_data.get('verdict', 'UNKNOWN'),
-                }]
+            doc_id = _doc_id(
+                f"{product_name}-{datetime.utcnow().isoformat()}-{next(self._doc_seq)}"
             )
+            
+            metadata = {
+                'product': product_name,  # Changed from 'product_name' for consistency
+                'health_score': analysis_data.get('health_score', 0),
+                'verdict': analysis_data.get('verdict', 'UNKNOWN'),
+            }
+            
+            self._ensure_vector_writer()
+            self._vector_queue.put_nowait((doc_id, text_content, metadata))
+        except queue.Full:
+            logger.warning("⚠️ Warning: Vector DB queue full, dropping document")
         except Exception as e:
-            print(f"⚠️ Warning: Could not add to vector DB: {e}")
+            logger.warning("⚠️ Warning: Could not add to vector DB: %s", e)
+
+    def flush_vector_writes(self) -> None:
+        """Block until every queued document has been written to the store."""
+        if self._vector_writer is not None:
+            self._vector_queue.join()
+
+    def _ensure_vector_writer(self) -> None:
+        """Start the background document writer thread if it is not running."""
+        if self._vector_writer is not None:
+            return
+        with self._vector_writer_lock:
+            if self._vector_writer is None:
+                self._vector_writer = threading.Thread(
+                    target=self._vector_writer_loop,
+                    name="bioguard-vector-writer",
+                    daemon=True,
+                )
+                self._vector_writer.start()
+
+    def _vector_writer_loop(self) -> None:
+        """Drain the queue forever, writing up to VECTOR_BATCH_SIZE docs at a time."""
+        while True:
+            batch = [self._vector_queue.get()]
+            deadline = time.monotonic() + VECTOR_BATCH_WAIT_SECONDS
+            while len(batch) < VECTOR_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._vector_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write_vector_batch(batch)
+            except Exception as e:
+                logger.warning("⚠️ Warning: Could not add to vector DB: %s", e)
+            finally:
+                for _ in batch:
+                    self._vector_queue.task_done()
+
+    def _write_vector_batch(self, batch: List[tuple]) -> None:
+        """Write queued ``(doc_id, text, metadata)`` documents in one call."""
+        food_collection = self.food_collection
+        if food_collection is not None:
+            ids, documents, metadatas = (list(column) for column in zip(*batch))
+            food_collection.add(ids=ids, documents=documents, metadatas=metadatas)
+            return
+        
+        analysis_store = self.analysis_store
+        if analysis_store is None:
+            return
+        with analysis_store.transact():
+            for doc_id, text_content, metadata in batch:
+                analysis_store.set(doc_id, _dumps({'text': text_content, 'metadata': metadata}))
     
     def get_user_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -481,41 +999,34 @@ class DBManager:
         Returns:
             List of analysis history records
         """
+        # Views re-read history on every rerun; a wider cached read also
+        # answers any narrower request
+        cached = self._history_cache.get(user_id)
+        if cached is not None and cached['limit'] >= limit:
+            return cached['rows'][:limit]
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT product, health_score, nova_score, verdict, created_at
-                FROM food_analysis
-                WHERE user_id = ?
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (user_id, limit))
-            
-            rows = cursor.fetchall()
-            conn.close()
+            with self._conn() as conn:
+                rows = conn.execute(SQL_SELECT_HISTORY, (user_id, limit)).fetchall()
             
-            return [
-                {
-                    'product': row[0],  # Changed from 'product_name' to 'product'
-                    'health_score': row[1],
-                    'nova_score': row[2],
-                    'verdict': row[3],
-                    'created_at': row[4],
-                }
-                for row in rows
-            ]
-        except Exception as e:
-            print(f"❌ Error retrieving history: {e}")
+            history = []
+            for row in rows:
+                record = dict(row)
+                record['created_at'] = _iso_from_us(record['created_at'])
+                history.append(record)
+            self._history_cache.put(user_id, {'limit': limit, 'rows': history})
+            return history
+        except Exception:
+            logger.exception("❌ Error retrieving history")
             return []
     
     def find_conflicts_in_graph(self, ingredients: List[str], medical_conditions: List[str]) -> List[Dict[str, Any]]:
         """
         Query knowledge graph for ingredient-health conflicts.
         
-        Searches the NetworkX graph for edges connecting user's ingredients
-        to their medical conditions, identifying potential health risks.
+        Scans the graph's precomputed ingredient adjacency index for edges
+        connecting user's ingredients to their medical conditions,
+        identifying potential health risks.
         
         Args:
             ingredients: List of food ingredients to check
@@ -524,24 +1035,20 @@ class DBManager:
         Returns:
             List of conflict dictionaries with ingredient, condition, relationship, and severity
         """
+        conditions = [cond.lower() for cond in medical_conditions]
         conflicts = []
         
         for ingredient in ingredients:
-            ingredient_lower = ingredient.lower().strip()
-            
-            # Check if ingredient has outgoing edges (conflicts)
-            if ingredient_lower in self.graph:
-                successors = self.graph.successors(ingredient_lower)
-                for successor in successors:
-                    # Check if the health condition matches user's conditions
-                    if any(cond.lower() in successor.lower() for cond in medical_conditions):
-                        edge_data = self.graph.edges[ingredient_lower, successor]
-                        conflicts.append({
-                            'ingredient': ingredient,
-                            'health_condition': successor,
-                            'relationship': edge_data.get('relationship', ''),
-                            'severity': edge_data.get('severity', 'medium'),
-                        })
+            edges = self._ingredient_edges.get(ingredient.lower().strip(), ())
+            for target, target_lower, relationship, severity in edges:
+                # Check if the health condition matches user's conditions
+                if any(cond in target_lower for cond in conditions):
+                    conflicts.append({
+                        'ingredient': ingredient,
+                        'health_condition': target,
+                        'relationship': relationship,
+                        'severity': severity,
+                    })
         
         return conflicts
     
@@ -557,45 +1064,67 @@ class DBManager:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        return self.save_federated_updates_batch([{
+            'client_id': client_id,
+            'model_weights': model_weights,
+            'accuracy': accuracy,
+        }])
+
+    def save_federated_updates_batch(self, updates: List[Dict[str, Any]]) -> bool:
+        """
+        Save a round of federated learning updates in a single transaction.
+        
+        Args:
+            updates: Dictionaries with client_id, model_weights and accuracy keys
             
-            cursor.execute("""
-                INSERT INTO fl_updates (client_id, model_weights, accuracy, update_timestamp)
-                VALUES (?, ?, ?, ?)
-            """, (
-                client_id,
-                json.dumps(model_weights),
-                accuracy,
-                datetime.utcnow().isoformat(),
-            ))
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            timestamp = _now_us()
+            rows = [
+                (
+                    update['client_id'],
+                    _dumps(update['model_weights']),
+                    update['accuracy'],
+                    timestamp,
+                )
+                for update in updates
+            ]
             
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(SQL_INSERT_FL, rows)
+                conn.commit()
             return True
-        except Exception as e:
-            print(f"❌ Error saving FL update: {e}")
+        except Exception:
+            logger.exception("❌ Error saving FL update")
             return False
     
     def clear_cache(self):
         """Clear in-memory caches (ChromaDB manages its own cache)."""
-        if self.chroma_client and CACHE_ENABLED:
+        if self._chroma_client and CACHE_ENABLED:
             pass  # Chroma handles its own cache
 
 
 # Global instance
 db_manager = None
+_db_manager_lock = threading.Lock()
 
 
 def get_db_manager() -> DBManager:
     """
     Get or create global database manager instance (singleton pattern).
     
+    Uses double-checked locking so concurrent first calls build exactly one
+    DBManager.
+    
     Returns:
         Global DBManager instance
     """
     global db_manager
     if db_manager is None:
-        db_manager = DBManager()
+        with _db_manager_lock:
+            if db_manager is None:
+                db_manager = DBManager()
     return db_manager
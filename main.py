@@ -3,56 +3,58 @@ BioGuard AI - Native Mobile Experience
 Modular UI with bottom navigation, theme wheel, and AR camera.
 """
 
-import os
-
-import streamlit as st
-from PIL import Image
-
-# Configure Streamlit early
+import asyncio
+import importlib.util
+from collections import deque
 
+# Use uvloop for the event loops streamlit-webrtc runs frame callbacks on;
+# falls back to the default asyncio loop where it is not installed (Windows)
+try:
+    import uvloop
+    if not isinstance(asyncio.get_event_loop_policy(), uvloop.EventLoopPolicy):
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
 
-def _get_page_icon():
-    """Load app icon from branding assets if available."""
-    logo_path = os.path.join("ui_components", "assets", "logo.png")
-    if os.path.exists(logo_path):
-        try:
-            return Image.open(logo_path)
-        except Exception:
-            return "🧬"
-    return "🧬"
+import streamlit as st
 
+from ui_components.branding import load_page_icon
 
+# Configure Streamlit early
+# main.py re-executes on every rerun; the icon is cached in the imported module
 st.set_page_config(
     page_title="BioGuard AI",
-    page_icon=_get_page_icon(),
+    page_icon=load_page_icon(),
     layout="wide",
     initial_sidebar_state="collapsed",
 )
 
 # Imports
-from app_config.settings import MOBILE_VIEWPORT
+from app_config.settings import (
+    AI_PROVIDER_INDEX,
+    AI_PROVIDER_OPTIONS,
+    AI_PROVIDERS,
+    ANALYSIS_HISTORY_MAX,
+    MOBILE_VIEWPORT,
+    SESSION_DEFAULTS,
+)
 from ui_components.theme_wheel import render_theme_wheel
 from ui_components.navigation import render_bottom_navigation, get_active_page
 from ui_components.dashboard_view import render_dashboard
 from ui_components.vault_view import render_vault
-from ui_components.oauth_login import render_oauth_login, handle_oauth_callback
 from ui_components.global_styles import inject_global_css
 from ui_components.branding import render_brand_header
 from ui_components.onboarding import render_onboarding
 from ui_components.router import ensure_nav_state, go_to, go_back, next_page, prev_page
 from ui_components.error_ui import safe_render
-from services.auth import create_or_login_user, logout
+from services.auth import logout
 from utils.i18n import get_lang, set_lang, t
 
-# Camera view - choose version
-try:
-    from ui_components.camera_view_refactored import render_camera_view as render_camera_new
-    REFACTORED_CAMERA_AVAILABLE = True
-except ImportError:
-    REFACTORED_CAMERA_AVAILABLE = False
-    render_camera_new = None
-
-from ui_components.camera_view import render_camera_view as render_camera_legacy
+# Camera view - choose version. Both are imported on first use: they pull in
+# streamlit-webrtc, aiortc and av, which sessions that never scan don't need
+REFACTORED_CAMERA_AVAILABLE = (
+    importlib.util.find_spec("ui_components.camera_view_refactored") is not None
+)
 
 PAGE_SUBTITLES = {
     "dashboard": "Health Dashboard",
@@ -66,25 +68,15 @@ PAGE_SUBTITLES = {
 
 def init_session_state() -> None:
     """Initialize session state variables."""
-    if "user_id" not in st.session_state:
-        st.session_state.user_id = None
-    if "authenticated" not in st.session_state:
-        st.session_state.authenticated = False
-    if "user_profile" not in st.session_state:
-        st.session_state.user_profile = None
-    if "active_theme" not in st.session_state:
-        st.session_state.active_theme = "dark"
-    if "analysis_history" not in st.session_state:
-        st.session_state.analysis_history = []
-    if "ai_provider" not in st.session_state:
-        st.session_state.ai_provider = "gemini"
-    if "use_refactored_camera" not in st.session_state:
-        st.session_state.use_refactored_camera = REFACTORED_CAMERA_AVAILABLE
+    state = st.session_state
+    for key, default in SESSION_DEFAULTS.items():
+        state.setdefault(key, default)
+    # Mutable default, so each session needs its own ring buffer
+    if "analysis_history" not in state:
+        state.analysis_history = deque(maxlen=ANALYSIS_HISTORY_MAX)
     # Initialize language with default English
     get_lang()  # This will set to "en" if not already set
     ensure_nav_state()
-    if "onboarding_done" not in st.session_state:
-        st.session_state.onboarding_done = False
 
 
 # ============== Authentication UI ==============
@@ -103,6 +95,8 @@ def render_settings_page() -> None:
 
 
 def _render_settings_inner() -> None:
+    state = st.session_state
+
     # Back button
     if st.button(f"⬅️ {t('go_home')}", key="settings_back_home"):
         go_back()
@@ -128,15 +122,11 @@ def _render_settings_inner() -> None:
     st.divider()
 
     st.markdown("### 🤖 AI Provider")
-    st.session_state.ai_provider = st.selectbox(
+    state.ai_provider = st.selectbox(
         "Choose AI engine",
-        options=["gemini", "openai", "mock"],
-        index=["gemini", "openai", "mock"].index(st.session_state.ai_provider or "gemini"),
-        format_func=lambda x: {
-            "gemini": "Gemini Vision",
-            "openai": "OpenAI Vision",
-            "mock": "Mock (offline)",
-        }.get(x, x),
+        options=AI_PROVIDER_OPTIONS,
+        index=AI_PROVIDER_INDEX.get(state.ai_provider, 0),
+        format_func=AI_PROVIDERS.get,
     )
     st.caption("Will use preferred engine, then fallback to others or mock mode if failed.")
     st.divider()
@@ -146,14 +136,14 @@ def _render_settings_inner() -> None:
         st.markdown("### 📸 Camera Version")
         use_new = st.checkbox(
             "Use Refactored Camera (Recommended)",
-            value=st.session_state.use_refactored_camera,
+            value=state.use_refactored_camera,
             help="New modular camera with better performance and cleaner UI"
         )
-        st.session_state.use_refactored_camera = use_new
+        state.use_refactored_camera = use_new
         st.divider()
 
     st.markdown("### 👤 Profile")
-    user = st.session_state.user_profile or {}
+    user = state.user_profile or {}
     col1, col2 = st.columns(2)
     with col1:
         st.text_input("Name", value=user.get("name", ""), key="profile_name")
@@ -169,46 +159,80 @@ def _render_settings_inner() -> None:
     st.markdown("### 🩺 Diagnostics")
     with st.expander("System Info", expanded=False):
         st.write({
-            "current_page": st.session_state.get("current_page", "N/A"),
-            "nav_stack_depth": len(st.session_state.get("nav_stack", [])),
-            "authenticated": st.session_state.get("authenticated", False),
-            "onboarding_done": st.session_state.get("onboarding_done", False),
-            "ai_provider": st.session_state.get("ai_provider", "N/A"),
-            "active_theme": st.session_state.get("active_theme", "N/A"),
+            "current_page": state.get("current_page", "N/A"),
+            "nav_stack_depth": len(state.get("nav_stack", [])),
+            "authenticated": state.get("authenticated", False),
+            "onboarding_done": state.get("onboarding_done", False),
+            "ai_provider": state.get("ai_provider", "N/A"),
+            "active_theme": state.get("active_theme", "N/A"),
         })
     
     st.divider()
     if st.button("🚪 Logout", width="stretch"):
-        logout(st.session_state.user_id or "")
-        st.session_state.authenticated = False
-        st.session_state.user_id = None
-        st.session_state.user_profile = None
+        logout(state.user_id or "")
+        state.authenticated = False
+        state.user_id = None
+        state.user_profile = None
         st.rerun()
 
 
+# ============== Page Routing ==============
+
+def _load_refactored_camera():
+    """Import the refactored camera view, or None if its dependencies are missing."""
+    try:
+        from ui_components.camera_view_refactored import render_camera_view
+    except ImportError:
+        return None
+    return render_camera_view
+
+
+def render_scan_page() -> None:
+    """Render the camera view version chosen in settings."""
+    render_camera_new = None
+    if st.session_state.use_refactored_camera and REFACTORED_CAMERA_AVAILABLE:
+        render_camera_new = _load_refactored_camera()
+    if render_camera_new is not None:
+        render_camera_new()
+    else:
+        # Legacy view is only imported by sessions that actually use it
+        from ui_components.camera_view import render_camera_view as render_camera_legacy
+        render_camera_legacy()
+
+
+PAGE_RENDERERS = {
+    "dashboard": render_dashboard,
+    "scan": render_scan_page,
+    "vault": render_vault,
+    "settings": render_settings_page,
+}
+
+
 # ============== Main Application ==============
 
 def main() -> None:
     init_session_state()
+    # One proxy lookup per rerun instead of one per attribute access
+    state = st.session_state
     st.markdown(MOBILE_VIEWPORT, unsafe_allow_html=True)
     inject_global_css()
 
-    if not st.session_state.authenticated:
+    if not state.authenticated:
         render_auth_screen()
         return
 
-    if not st.session_state.onboarding_done:
+    if not state.onboarding_done:
         render_onboarding()
         return
 
     def _handle_swipe_navigation() -> None:
         """Update current_page based on swipe gestures."""
-        if st.session_state.get("swipe_next"):
-            st.session_state.swipe_next = False
+        if state.get("swipe_next"):
+            state.swipe_next = False
             go_to(next_page())
 
-        if st.session_state.get("swipe_prev"):
-            st.session_state.swipe_prev = False
+        if state.get("swipe_prev"):
+            state.swipe_prev = False
             go_to(prev_page())
 
     _handle_swipe_navigation()
@@ -217,22 +241,11 @@ def main() -> None:
 
     if page != "scan":
         render_brand_header(subtitle=PAGE_SUBTITLES.get(page, "BioGuard AI"))
-        if page != "dashboard" and st.session_state.get("nav_stack"):
+        if page != "dashboard" and state.get("nav_stack"):
             if st.button("⬅️ رجوع", key="back_btn_top"):
                 go_back()
 
-    if page == "dashboard":
-        render_dashboard()
-    elif page == "scan":
-        # Choose camera version based on settings
-        if st.session_state.use_refactored_camera and REFACTORED_CAMERA_AVAILABLE:
-            render_camera_new()
-        else:
-            render_camera_legacy()
-    elif page == "vault":
-        render_vault()
-    elif page == "settings":
-        render_settings_page()
+    PAGE_RENDERERS.get(page, render_dashboard)()
 
     render_bottom_navigation()
 
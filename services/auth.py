@@ -7,8 +7,10 @@ import os
 import sqlite3
 import hashlib
 import secrets
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 
 from services.auth_privacy import get_auth_manager
 from database.db_manager import get_db_manager
@@ -16,27 +18,49 @@ from database.db_manager import get_db_manager
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "app_data.db")
 
+# One connection per process, shared by Streamlit session threads under a lock,
+# instead of reconnecting (and re-running the schema) on every login click
+_connection: Optional[sqlite3.Connection] = None
+_connection_lock = threading.RLock()
+
 
 def ensure_db():
     """Create database and tables if they don't exist."""
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            is_admin INTEGER DEFAULT 0,
-            created_at TEXT NOT NULL
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
+    global _connection
+    with _connection_lock:
+        if _connection is not None:
+            return
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        cursor = conn.cursor()
+        
+        # Users table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                is_admin INTEGER DEFAULT 0,
+                created_at TEXT NOT NULL
+            )
+        """)
+        
+        conn.commit()
+        _connection = conn
+
+
+@contextmanager
+def _db() -> Iterator[sqlite3.Connection]:
+    """Hold the shared connection; commit on success, roll back on error."""
+    ensure_db()
+    with _connection_lock:
+        try:
+            yield _connection
+            _connection.commit()
+        except Exception:
+            _connection.rollback()
+            raise
 
 
 def hash_password(password: str) -> str:
@@ -73,17 +97,14 @@ def register_user(email: str, password: str, is_admin: bool = False) -> Dict[str
         return {"success": False, "message": "Password must be at least 6 characters"}
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
+        # Hash outside the lock; PBKDF2 is the slow part
         pwd_hash = hash_password(password)
-        cursor.execute(
-            "INSERT INTO users (email, password_hash, is_admin, created_at) VALUES (?, ?, ?, ?)",
-            (email, pwd_hash, 1 if is_admin else 0, datetime.utcnow().isoformat())
-        )
-        conn.commit()
-        user_id = cursor.lastrowid
-        conn.close()
+        with _db() as conn:
+            cursor = conn.execute(
+                "INSERT INTO users (email, password_hash, is_admin, created_at) VALUES (?, ?, ?, ?)",
+                (email, pwd_hash, 1 if is_admin else 0, datetime.utcnow().isoformat())
+            )
+            user_id = cursor.lastrowid
         
         return {"success": True, "message": "User registered successfully", "user_id": user_id}
     
@@ -105,12 +126,10 @@ def login_user(email: str, password: str) -> Dict[str, Any]:
     email = email.strip().lower()
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, password_hash, is_admin FROM users WHERE email = ?", (email,))
-        result = cursor.fetchone()
-        conn.close()
+        with _db() as conn:
+            result = conn.execute(
+                "SELECT id, password_hash, is_admin FROM users WHERE email = ?", (email,)
+            ).fetchone()
         
         if not result:
             return {"success": False, "message": "Invalid email or password"}
@@ -136,11 +155,10 @@ def get_user(user_id: int) -> Optional[Dict[str, Any]]:
     ensure_db()
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, email, is_admin, created_at FROM users WHERE id = ?", (user_id,))
-        result = cursor.fetchone()
-        conn.close()
+        with _db() as conn:
+            result = conn.execute(
+                "SELECT id, email, is_admin, created_at FROM users WHERE id = ?", (user_id,)
+            ).fetchone()
         
         if result:
             return {
@@ -160,11 +178,10 @@ def get_all_users() -> List[Dict[str, Any]]:
     ensure_db()
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, email, is_admin, created_at FROM users ORDER BY created_at DESC")
-        results = cursor.fetchall()
-        conn.close()
+        with _db() as conn:
+            results = conn.execute(
+                "SELECT id, email, is_admin, created_at FROM users ORDER BY created_at DESC"
+            ).fetchall()
         
         return [
             {
@@ -189,13 +206,9 @@ def init_admin_user():
     
     # Check if admin exists
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id FROM users WHERE is_admin = 1")
-        if cursor.fetchone():
-            conn.close()
-            return
-        conn.close()
+        with _db() as conn:
+            if conn.execute("SELECT id FROM users WHERE is_admin = 1").fetchone():
+                return
     except Exception:
         pass
     
@@ -7,6 +7,7 @@ import jwt
 import hashlib
 import secrets
 import asyncio
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, Tuple
 import json
@@ -212,11 +213,14 @@ class AuthPrivacyManager:
 
 # Global instance
 auth_manager = None
+_auth_manager_lock = threading.Lock()
 
 
 def get_auth_manager() -> AuthPrivacyManager:
     """Get or create global auth manager instance."""
     global auth_manager
     if auth_manager is None:
-        auth_manager = AuthPrivacyManager()
+        with _auth_manager_lock:
+            if auth_manager is None:
+                auth_manager = AuthPrivacyManager()
     return auth_manager
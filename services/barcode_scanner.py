@@ -4,6 +4,7 @@ Handles barcode detection, OCR text extraction, and nutrition label parsing.
 """
 
 import logging
+import threading
 from typing import Optional, Dict, Any, List
 import numpy as np
 
@@ -267,11 +268,9 @@ class BarcodeScannerService:
                 ingredients_text = match.group(1)
                 
                 # Split by comma or semicolon
-                ingredients = [
-                    ing.strip() 
-                    for ing in re.split(r'[,;]', ingredients_text)
-                    if ing.strip()
-                ]
+                ingredients = list(
+                    filter(None, map(str.strip, re.split(r'[,;]', ingredients_text)))
+                )
                 
                 self.logger.info(f"🧪 Found {len(ingredients)} ingredients")
                 return ingredients
@@ -285,11 +284,14 @@ class BarcodeScannerService:
 
 # Global instance
 barcode_scanner = None
+_barcode_scanner_lock = threading.Lock()
 
 
 def get_barcode_scanner() -> BarcodeScannerService:
     """Get or create global barcode scanner instance."""
     global barcode_scanner
     if barcode_scanner is None:
-        barcode_scanner = BarcodeScannerService()
+        with _barcode_scanner_lock:
+            if barcode_scanner is None:
+                barcode_scanner = BarcodeScannerService()
     return barcode_scanner
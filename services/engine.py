@@ -4,12 +4,40 @@ Provides robust multi-provider LLM analysis with automatic fallback.
 """
 
 import logging
-from typing import Dict, Any, List
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 import asyncio
 import base64
+import copy
+import json
 import os
+import threading
+from concurrent.futures import Future
 
-from app_config.settings import GEMINI_API_KEY, OPENAI_API_KEY
+from app_config.settings import AI_PROVIDER_HEDGE_DELAY_SECONDS, GEMINI_API_KEY, OPENAI_API_KEY
+
+# Provider SDKs are optional; imported once at startup instead of on the
+# first capture of each process
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# SIMD base64 for the image payload; same output as the stdlib encoder
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -19,27 +47,181 @@ logging.basicConfig(
 )
 
 
-def _build_provider_order(preferred: str) -> List[str]:
+# Provider clients are built once per process and reused across captures
+_gemini_model = None
+_openai_client = None
+_client_lock = threading.Lock()
+
+
+def get_gemini_model():
     """
-    Build provider priority list with fallback chain.
+    Get or create the shared Gemini vision model.
+    
+    Raises:
+        RuntimeError: If API key is missing or package not installed
+    """
+    global _gemini_model
+    if _gemini_model is None:
+        if not GEMINI_API_KEY:
+            raise RuntimeError("GEMINI_API_KEY is missing")
+        if genai is None:  # pragma: no cover
+            raise RuntimeError("google-generativeai is not installed")
+        with _client_lock:
+            if _gemini_model is None:
+                genai.configure(api_key=GEMINI_API_KEY)
+                _gemini_model = genai.GenerativeModel(
+                    "gemini-1.5-flash",
+                    generation_config={"response_mime_type": "application/json"},
+                )
+    return _gemini_model
+
+
+def get_openai_client():
+    """
+    Get or create the shared OpenAI client (keeps its HTTP connection pool).
+    
+    Raises:
+        RuntimeError: If API key is missing or package not installed
+    """
+    global _openai_client
+    if _openai_client is None:
+        if not OPENAI_API_KEY:
+            raise RuntimeError("OPENAI_API_KEY is missing")
+        if openai is None:  # pragma: no cover
+            raise RuntimeError("openai is not installed")
+        with _client_lock:
+            if _openai_client is None:
+                _openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+    return _openai_client
+
+
+_warm_started = False
+
+
+def _warm_up() -> None:
+    """Start the background loop and build the configured provider clients."""
+    _get_event_loop()
+    for provider, build in (("gemini", get_gemini_model), ("openai", get_openai_client)):
+        try:
+            build()
+        except Exception as e:
+            logger.debug(f"Skipping {provider} warm-up: {e}")
+    logger.info("✓ AI providers warmed up")
+
+
+def warm_up_providers() -> None:
+    """
+    Prepare provider clients in the background, once per process.
+    
+    Called when the camera view renders so the first capture does not pay
+    for SDK setup; later calls return immediately.
+    """
+    global _warm_started
+    if _warm_started:
+        return
+    with _client_lock:
+        if _warm_started:
+            return
+        _warm_started = True
+    threading.Thread(target=_warm_up, name="engine-warm-up", daemon=True).start()
+
+
+ANALYSIS_PROMPT = (
+    "You are a nutritionist. Given a food photo, return a concise JSON with keys: "
+    "product (string), health_score (0-100 int), verdict (SAFE|WARNING|DANGER), "
+    "warnings (array of strings). Keep it very short."
+)
+VERDICTS = {"SAFE", "WARNING", "DANGER"}
+
+
+def _parse_analysis(text: str, fallback: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse a provider's JSON answer into the analysis result shape.
     
     Args:
-        preferred: Preferred provider name ('gemini' or 'openai')
+        text: Raw model output, expected to be a JSON object
+        fallback: Result returned (with the raw text as a warning) if the
+            output is not valid JSON, e.g. when truncated at max_tokens
         
     Returns:
-        List of provider names in order of preference, always ending with 'mock'
+        Analysis result dictionary
     """
-    preferred = preferred.lower()
+    # Both providers run in JSON mode; unwrap a ``` fence defensively in case one slips through
+    payload = text.strip()
+    if payload.startswith("```"):
+        payload = payload.split("\n", 1)[-1].rsplit("```", 1)[0]
+    try:
+        data = orjson.loads(payload) if orjson is not None else json.loads(payload)
+    except ValueError:  # orjson.JSONDecodeError and json.JSONDecodeError both subclass it
+        logger.warning("Provider returned non-JSON output; using fallback result")
+        return {**fallback, "warnings": [text[:180]]}
+    if not isinstance(data, dict):
+        return {**fallback, "warnings": [text[:180]]}
+    
+    try:
+        health_score = min(100, max(0, int(data.get("health_score", fallback["health_score"]))))
+    except (TypeError, ValueError):
+        health_score = fallback["health_score"]
+    verdict = str(data.get("verdict", "")).upper()
+    warnings = data.get("warnings") or []
+    if not isinstance(warnings, list):
+        warnings = [warnings]
+    return {
+        "product": str(data.get("product") or fallback["product"]),
+        "health_score": health_score,
+        "verdict": verdict if verdict in VERDICTS else fallback["verdict"],
+        "warnings": [str(w) for w in warnings],
+    }
+
+
+def _provider_order(preferred: str, has_gemini: bool, has_openai: bool) -> Tuple[str, ...]:
+    """Pure provider order for a preference and the set of configured keys."""
     order = [preferred] if preferred in {"gemini", "openai"} else []
     # Add the other provider as fallback
-    if preferred != "gemini" and GEMINI_API_KEY:
+    if preferred != "gemini" and has_gemini:
         order.append("gemini")
-    if preferred != "openai" and OPENAI_API_KEY:
+    if preferred != "openai" and has_openai:
         order.append("openai")
     # Always end with mock so UI never breaks
     order.append("mock")
-    logger.debug(f"Provider order: {order}")
-    return order
+    return tuple(order)
+
+
+# Every (preference, gemini key set, openai key set) combination, built once
+_PROVIDER_ORDERS = {
+    (preferred, has_gemini, has_openai): _provider_order(preferred, has_gemini, has_openai)
+    for preferred in ("gemini", "openai", "mock")
+    for has_gemini in (False, True)
+    for has_openai in (False, True)
+}
+
+
+def _build_provider_order(preferred: str) -> Tuple[str, ...]:
+    """
+    Build provider priority list with fallback chain.
+    
+    Args:
+        preferred: Preferred provider name ('gemini' or 'openai')
+        
+    Returns:
+        Provider names in order of preference, always ending with 'mock'
+    """
+    preferred = preferred.lower()
+    if preferred not in {"gemini", "openai"}:
+        preferred = "mock"
+    # Keys are looked up per call so patched/rotated keys are respected
+    return _PROVIDER_ORDERS[(preferred, bool(GEMINI_API_KEY), bool(OPENAI_API_KEY))]
+
+
+def needs_image_bytes() -> bool:
+    """
+    Whether an analysis could send the image anywhere.
+    
+    False when no provider key is configured: every preference then ends in
+    the mock provider, which never reads the image, so callers can skip
+    encoding it.
+    """
+    return bool(GEMINI_API_KEY) or bool(OPENAI_API_KEY)
 
 
 async def _analyze_with_gemini(image_bytes: bytes) -> Dict[str, Any]:
@@ -55,32 +237,17 @@ async def _analyze_with_gemini(image_bytes: bytes) -> Dict[str, Any]:
     Raises:
         RuntimeError: If API key is missing or package not installed
     """
-    if not GEMINI_API_KEY:
-        raise RuntimeError("GEMINI_API_KEY is missing")
-    try:
-        import google.generativeai as genai
-    except ImportError as exc:  # pragma: no cover
-        raise RuntimeError("google-generativeai is not installed") from exc
-
+    model = get_gemini_model()
     logger.info("Starting Gemini analysis")
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel("gemini-1.5-flash")
-    prompt = (
-        "You are a nutritionist. Given a food photo, return a concise JSON with keys: "
-        "product (string), health_score (0-100 int), verdict (SAFE|WARNING|DANGER), "
-        "warnings (array of strings). Keep it very short."
-    )
     image_part = {"mime_type": "image/jpeg", "data": image_bytes}
-    response = await asyncio.to_thread(model.generate_content, [prompt, image_part])
+    response = await asyncio.to_thread(model.generate_content, [ANALYSIS_PROMPT, image_part])
     text = response.text or "{}"
     logger.info(f"Gemini analysis completed: {len(text)} chars")
-    # Fallback minimal parsing to avoid crashes if output is not JSON
-    return {
-        "product": "Gemini Vision",
-        "health_score": 80,
-        "verdict": "SAFE",
-        "warnings": [text[:180]],
-    }
+    # Fall back to a minimal result if output is not JSON
+    return _parse_analysis(
+        text,
+        {"product": "Gemini Vision", "health_score": 80, "verdict": "SAFE", "warnings": []},
+    )
 
 
 async def _analyze_with_openai(image_bytes: bytes) -> Dict[str, Any]:
@@ -96,21 +263,17 @@ async def _analyze_with_openai(image_bytes: bytes) -> Dict[str, Any]:
     Raises:
         RuntimeError: If API key is missing or package not installed
     """
-    if not OPENAI_API_KEY:
-        raise RuntimeError("OPENAI_API_KEY is missing")
-    try:
-        import openai
-    except ImportError as exc:  # pragma: no cover
-        raise RuntimeError("openai is not installed") from exc
-
+    client = get_openai_client()
     logger.info("Starting OpenAI analysis")
-    client = openai.OpenAI(api_key=OPENAI_API_KEY)
-    b64_image = base64.b64encode(image_bytes).decode("utf-8")
+    if pybase64 is not None:
+        b64_image = pybase64.b64encode_as_string(image_bytes)
+    else:
+        b64_image = base64.b64encode(image_bytes).decode("utf-8")
     messages = [
         {
             "role": "user",
             "content": [
-                {"type": "text", "text": "Analyze this food photo and return concise insights."},
+                {"type": "text", "text": ANALYSIS_PROMPT},
                 {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64_image}"}},
             ],
         }
@@ -119,16 +282,16 @@ async def _analyze_with_openai(image_bytes: bytes) -> Dict[str, Any]:
         client.chat.completions.create,
         model="gpt-4o-mini",
         messages=messages,
-        max_tokens=200,
+        # Room for the full JSON object; a truncated answer would not parse
+        max_tokens=300,
+        response_format={"type": "json_object"},
     )
-    content = resp.choices[0].message.content
+    content = resp.choices[0].message.content or "{}"
     logger.info(f"OpenAI analysis completed: {len(content)} chars")
-    return {
-        "product": "OpenAI Vision",
-        "health_score": 78,
-        "verdict": "SAFE",
-        "warnings": [content[:180]],
-    }
+    return _parse_analysis(
+        content,
+        {"product": "OpenAI Vision", "health_score": 78, "verdict": "SAFE", "warnings": []},
+    )
 
 
 async def _mock_analysis() -> Dict[str, Any]:
@@ -148,48 +311,65 @@ async def _mock_analysis() -> Dict[str, Any]:
     }
 
 
-async def analyze_image(image_bytes: bytes, preferred_provider: str = "gemini") -> Dict[str, Any]:
+async def _run_provider(provider: str, image_bytes: bytes) -> Dict[str, Any]:
+    """Dispatch to a real (non-mock) provider by name."""
+    if provider == "gemini":
+        return await _analyze_with_gemini(image_bytes)
+    if provider == "openai":
+        return await _analyze_with_openai(image_bytes)
+    raise RuntimeError(f"Unknown provider {provider}")
+
+
+async def _analyze_image(image_bytes: bytes, preferred_provider: str) -> Tuple[Dict[str, Any], str]:
     """
-    Analyze food image with automatic provider fallback.
-    
-    Attempts to use preferred provider, falls back to alternatives if needed,
-    and collects error messages for debugging.
+    Run the hedged provider chain (see analyze_image).
     
-    Args:
-        image_bytes: Raw image data as bytes
-        preferred_provider: Preferred AI provider ('gemini' or 'openai')
-        
     Returns:
-        Analysis result dictionary with product, health_score, verdict, and warnings
+        (analysis result, name of the provider that produced it)
     """
     errors: List[str] = []
+    queue = [p for p in _build_provider_order(preferred_provider) if p != "mock"]
+    running: Dict[asyncio.Task, str] = {}
     
-    for provider in _build_provider_order(preferred_provider):
-        try:
-            if provider == "gemini":
-                result = await _analyze_with_gemini(image_bytes)
-                logger.info(f"✓ Gemini analysis successful")
-                return result
-            elif provider == "openai":
-                result = await _analyze_with_openai(image_bytes)
-                logger.info(f"✓ OpenAI analysis successful")
-                return result
-            elif provider == "mock":
-                result = await _mock_analysis()
-                # Include accumulated errors in warnings when using mock
-                if errors:
-                    logger.warning(f"Fell back to mock after errors: {errors}")
-                    result["warnings"] = [
-                        *result.get("warnings", []),
-                        "⚠️ Using mock data - API providers unavailable",
-                        *[f"Error: {err}" for err in errors[:2]]  # Limit to 2 errors
-                    ]
-                return result
-        except Exception as exc:  # pragma: no cover
-            error_msg = f"{provider}: {str(exc)}"
-            logger.error(f"Provider {provider} failed: {exc}")
-            errors.append(error_msg)
-            continue
+    try:
+        while queue or running:
+            if queue:
+                provider = queue.pop(0)
+                running[asyncio.create_task(_run_provider(provider, image_bytes))] = provider
+            # Only wait out the head start if there is someone left to hedge with
+            done, _ = await asyncio.wait(
+                set(running),
+                timeout=AI_PROVIDER_HEDGE_DELAY_SECONDS if queue else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                provider = running.pop(task)
+                try:
+                    result = task.result()
+                except Exception as exc:
+                    logger.error(f"Provider {provider} failed: {exc}")
+                    errors.append(f"{provider}: {str(exc)}")
+                    continue
+                logger.info(f"✓ {provider} analysis successful")
+                return result, provider
+    finally:
+        for task in running:
+            task.cancel()
+    
+    try:
+        result = await _mock_analysis()
+        # Include accumulated errors in warnings when using mock
+        if errors:
+            logger.warning(f"Fell back to mock after errors: {errors}")
+            result["warnings"] = [
+                *result.get("warnings", []),
+                "⚠️ Using mock data - API providers unavailable",
+                *[f"Error: {err}" for err in errors[:2]]  # Limit to 2 errors
+            ]
+        return result, "mock"
+    except Exception as exc:  # pragma: no cover
+        logger.error(f"Provider mock failed: {exc}")
+        errors.append(f"mock: {str(exc)}")
     
     # Fallback if even mock fails (should never happen)
     logger.critical("All providers failed including mock")
@@ -198,21 +378,118 @@ async def analyze_image(image_bytes: bytes, preferred_provider: str = "gemini")
         "health_score": 50,
         "verdict": "WARNING",
         "warnings": errors or ["No provider succeeded"],
-    }
+    }, "none"
+
+
+async def analyze_image(image_bytes: bytes, preferred_provider: str = "gemini") -> Dict[str, Any]:
+    """
+    Analyze food image with automatic provider fallback.
+    
+    The preferred provider starts first; if it has not answered within
+    AI_PROVIDER_HEDGE_DELAY_SECONDS (or fails), the next provider is started
+    alongside it. The first successful result wins and the rest are
+    cancelled. Mock is used only when every real provider failed.
+    
+    Args:
+        image_bytes: Raw image data as bytes
+        preferred_provider: Preferred AI provider ('gemini' or 'openai')
+        
+    Returns:
+        Analysis result dictionary with product, health_score, verdict, and warnings
+    """
+    result, _ = await _analyze_image(image_bytes, preferred_provider)
+    return result
+
+
+# One event loop per process on a daemon thread, reused by every sync call
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get or start the background event loop used by the sync wrappers."""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="engine-loop", daemon=True
+                ).start()
+                _loop = loop
+    return _loop
+
+
+# Recent results by (image hash, provider); repeat shots of the same product
+# skip the provider call entirely
+ANALYSIS_CACHE_MAX_ENTRIES = 256
+_analysis_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+
+async def _analyze_image_cached(
+    image_bytes: bytes, preferred_provider: str, image_key: Optional[str]
+) -> Dict[str, Any]:
+    """Serve repeat images from the result cache, else run the providers."""
+    cache_key = (image_key, preferred_provider) if image_key else None
+    if cache_key is not None:
+        with _analysis_cache_lock:
+            cached = _analysis_cache.get(cache_key)
+            if cached is not None:
+                _analysis_cache.move_to_end(cache_key)
+        if cached is not None:
+            logger.info(f"✓ Reusing analysis for image {image_key}")
+            # Callers annotate the result in place, so hand out a copy
+            return copy.deepcopy(cached)
+    
+    result, provider = await _analyze_image(image_bytes, preferred_provider)
+    
+    # Mock/failed results are not cached so a provider outage is not pinned
+    if cache_key is not None and provider in {"gemini", "openai"}:
+        with _analysis_cache_lock:
+            _analysis_cache[cache_key] = copy.deepcopy(result)
+            _analysis_cache.move_to_end(cache_key)
+            while len(_analysis_cache) > ANALYSIS_CACHE_MAX_ENTRIES:
+                _analysis_cache.popitem(last=False)
+    return result
+
+
+def submit_analysis(
+    image_bytes: bytes,
+    preferred_provider: str = "gemini",
+    image_key: Optional[str] = None,
+) -> Future:
+    """
+    Start an analysis on the background loop and return its future.
+    
+    Same arguments and result as analyze_image_sync; poll ``done()`` from
+    Streamlit reruns instead of blocking the script on the provider call.
+    """
+    # Avoids creating and tearing down a loop (and its executor) per capture
+    return asyncio.run_coroutine_threadsafe(
+        _analyze_image_cached(image_bytes, preferred_provider, image_key),
+        _get_event_loop(),
+    )
 
 
-def analyze_image_sync(image_bytes: bytes, preferred_provider: str = "gemini") -> Dict[str, Any]:
+def analyze_image_sync(
+    image_bytes: bytes,
+    preferred_provider: str = "gemini",
+    image_key: Optional[str] = None,
+) -> Dict[str, Any]:
     """
     Synchronous wrapper for Streamlit callbacks.
     
     Args:
         image_bytes: Raw image data as bytes
         preferred_provider: Preferred AI provider ('gemini' or 'openai')
+        image_key: Optional perceptual hash of the image; identical keys
+            reuse a previous real-provider result
         
     Returns:
         Analysis result dictionary
     """
-    return asyncio.run(analyze_image(image_bytes, preferred_provider=preferred_provider))
+    return submit_analysis(image_bytes, preferred_provider, image_key).result()
 
 
 async def fetch_dashboard_metrics() -> Dict[str, Any]:
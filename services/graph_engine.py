@@ -4,12 +4,35 @@ Maps relationships between ingredients, health conditions, and medical profiles.
 Enables intelligent conflict detection beyond simple text matching.
 """
 
+import threading
+
 import networkx as nx
-from typing import List, Dict, Any, Set, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
+from app_config.settings import GRAPH_BACKEND
 from database.db_manager import get_db_manager
 from models.schemas import GraphConflict
 
 
+def _resolve_graph_backend(name: str) -> Optional[str]:
+    """Return ``name`` if it is an installed NetworkX dispatch backend, else None."""
+    if not name:
+        return None
+    try:
+        from networkx.utils.backends import backends
+    except ImportError:
+        return None
+    if name not in backends:
+        print(f"⚠️ NetworkX backend '{name}' is not installed; using pure-Python NetworkX")
+        return None
+    return name
+
+
+# Optional accelerated backend (e.g. "cugraph" from nx-cugraph) for graph algorithms
+_GRAPH_BACKEND = _resolve_graph_backend(GRAPH_BACKEND)
+
+CONFLICT_CACHE_MAX_ENTRIES = 256
+
+
 class GraphEngine:
     """Knowledge Graph for health-ingredient relationships."""
     
@@ -17,7 +40,10 @@ class GraphEngine:
         """Initialize graph engine with access to hybrid database."""
         self.db = get_db_manager()
         self.graph = self.db.graph
+        # Conflict results by (ingredients, conditions, allergies); rescans of
+        # the same product skip the graph walk. Cleared when the graph changes
         self.cache = {}
+        self._cache_lock = threading.Lock()
     
     def find_hidden_conflicts(
         self,
@@ -29,6 +55,12 @@ class GraphEngine:
         Advanced conflict detection using knowledge graph.
         Goes beyond simple pattern matching to find indirect relationships.
         """
+        cache_key = (tuple(ingredients), tuple(medical_conditions), tuple(allergies))
+        with self._cache_lock:
+            cached = self.cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         conflicts = []
         
         # Direct conflicts (ingredient -> medical condition)
@@ -54,7 +86,12 @@ class GraphEngine:
                 seen.add(key)
                 unique_conflicts.append(conflict)
         
-        return unique_conflicts
+        with self._cache_lock:
+            if len(self.cache) >= CONFLICT_CACHE_MAX_ENTRIES:
+                # Oldest first (dicts keep insertion order)
+                self.cache.pop(next(iter(self.cache)))
+            self.cache[cache_key] = unique_conflicts
+        return list(unique_conflicts)
     
     def _find_direct_conflicts(
         self,
@@ -150,11 +187,13 @@ class GraphEngine:
             'wheat': ['wheat', 'gluten', 'barley', 'rye'],
         }
         
+        # Normalize allergies once rather than once per ingredient
+        normalized_allergies = [(allergy, allergy.lower().strip()) for allergy in allergies]
+        
         for ingredient in ingredients:
             ingredient_lower = ingredient.lower().strip()
             
-            for allergy in allergies:
-                allergy_lower = allergy.lower().strip()
+            for allergy, allergy_lower in normalized_allergies:
                 
                 # Check direct match
                 if allergy_lower in ingredient_lower:
@@ -188,29 +227,23 @@ class GraphEngine:
         target: str,
         max_depth: int = 3
     ) -> List[List[str]]:
-        """Find paths between nodes using BFS."""
+        """
+        Find simple paths of at most ``max_depth`` nodes, shortest first.
+        
+        Runs through NetworkX's dispatchable ``all_simple_paths`` so a
+        configured GRAPH_BACKEND can take over the traversal.
+        """
         if source not in self.graph or target not in self.graph:
             return []
+        if source == target:
+            return [[source]]
         
-        paths = []
-        queue = [(source, [source])]
-        visited = {source}
-        
-        while queue:
-            current, path = queue.pop(0)
-            
-            if len(path) > max_depth:
-                continue
-            
-            if current == target:
-                paths.append(path)
-                continue
-            
-            for neighbor in self.graph.successors(current):
-                if neighbor not in visited or len(path) < max_depth:
-                    queue.append((neighbor, path + [neighbor]))
-        
-        return paths
+        # backend= only exists on NetworkX >= 3.2; _GRAPH_BACKEND is None on older releases
+        backend_kwargs = {"backend": _GRAPH_BACKEND} if _GRAPH_BACKEND else {}
+        paths = nx.all_simple_paths(
+            self.graph, source, target, cutoff=max_depth - 1, **backend_kwargs
+        )
+        return sorted(paths, key=len)
     
     def _calculate_path_severity(self, path: List[str]) -> str:
         """Calculate severity based on path edges."""
@@ -270,14 +303,11 @@ class GraphEngine:
             source_norm = self._normalize(source)
             target_norm = self._normalize(target)
             
-            self.graph.add_edge(
-                source_norm, target_norm,
-                relationship=relationship,
-                severity=severity
-            )
+            self.db.add_graph_edge(source_norm, target_norm, relationship, severity)
             
             # Clear cache
-            self.cache.clear()
+            with self._cache_lock:
+                self.cache.clear()
             return True
         except Exception as e:
             print(f"❌ Error adding relationship: {e}")
@@ -328,11 +358,14 @@ class GraphEngine:
 
 # Global instance
 graph_engine = None
+_graph_engine_lock = threading.Lock()
 
 
 def get_graph_engine() -> GraphEngine:
     """Get or create global graph engine instance."""
     global graph_engine
     if graph_engine is None:
-        graph_engine = GraphEngine()
+        with _graph_engine_lock:
+            if graph_engine is None:
+                graph_engine = GraphEngine()
     return graph_engine
@@ -1,7 +1,54 @@
 """Image utility functions for consistent handling across the app."""
+import threading
+from typing import Optional
+
 from PIL import Image
 import numpy as np
-import cv2
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# libjpeg-turbo bindings; encode BGR numpy frames without a PIL round-trip.
+# simplejpeg bundles libjpeg-turbo in its wheels; PyTurboJPEG needs the system lib
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+except ImportError:
+    TurboJPEG = None
+    TJPF_BGR = None
+    TJSAMP_420 = None
+
+try:
+    import imagehash
+except ImportError:
+    imagehash = None
+
+_jpeg_encoder = None
+_jpeg_encoder_lock = threading.Lock()
+
+
+def get_jpeg_encoder():
+    """
+    Get the shared TurboJPEG encoder, or None if it is unavailable.
+    
+    Loading libturbojpeg is not free, so it happens once per process.
+    """
+    global _jpeg_encoder, TurboJPEG
+    if _jpeg_encoder is None and TurboJPEG is not None:
+        with _jpeg_encoder_lock:
+            if _jpeg_encoder is None and TurboJPEG is not None:
+                try:
+                    _jpeg_encoder = TurboJPEG()
+                except (OSError, RuntimeError):
+                    # Python package present but the shared library is missing
+                    TurboJPEG = None
+    return _jpeg_encoder
 
 
 def ensure_rgb(img: Image.Image) -> Image.Image:
@@ -49,50 +96,161 @@ def ensure_rgb_from_array(frame: np.ndarray) -> np.ndarray:
     
     # If 4-channel (BGRA), convert to BGR
     if channels == 4:
+        if cv2 is None:
+            return np.ascontiguousarray(frame[:, :, :3])
         return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
     
     # If 1-channel (grayscale), convert to BGR
     if channels == 1:
+        if cv2 is None:
+            return np.repeat(frame, 3, axis=2)
         return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
     
     # Already 3-channel (BGR or RGB)
     return frame
 
 
-def image_to_jpeg_bytes(img: Image.Image) -> bytes:
+def downscale_frame(frame: np.ndarray, max_dim: int) -> np.ndarray:
+    """
+    Shrink a frame so its long side is at most ``max_dim`` pixels.
+    
+    Args:
+        frame: numpy array from camera or image
+        max_dim: Maximum width/height in pixels
+        
+    Returns:
+        The original frame if already small enough, else a resized copy
+    """
+    h, w = frame.shape[:2]
+    scale = max_dim / max(h, w)
+    if scale >= 1:
+        return frame
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    if cv2 is not None:
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    return np.asarray(Image.fromarray(frame).resize(size, Image.BOX))
+
+
+def _bgr_to_pil(frame: np.ndarray) -> Image.Image:
+    """
+    RGB PIL image from a 3-channel BGR frame.
+    
+    PIL swaps the channels while unpacking the buffer, so no flipped numpy
+    copy of the frame is made first.
+    """
+    frame = np.ascontiguousarray(frame)  # no-op for camera frames
+    h, w = frame.shape[:2]
+    return Image.frombuffer("RGB", (w, h), frame, "raw", "BGR", 0, 1)
+
+
+def frame_hash(frame: np.ndarray) -> str:
+    """
+    64-bit perceptual hash of a frame, as hex.
+    
+    Near-identical shots of the same product hash the same, so the hash can
+    key a result cache. Uses imagehash's pHash when installed, otherwise a
+    difference hash over a 9x8 grayscale thumbnail.
+    
+    Args:
+        frame: numpy array (BGR from camera)
+        
+    Returns:
+        16-character hex string
+    """
+    frame = ensure_rgb_from_array(frame)
+    img = Image.fromarray(frame) if frame.ndim == 2 else _bgr_to_pil(frame)
+    if imagehash is not None:
+        return str(imagehash.phash(img, hash_size=8))
+    
+    pixels = np.asarray(img.convert("L").resize((9, 8), Image.BOX), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return f"{int(''.join('1' if b else '0' for b in bits), 2):016x}"
+
+
+def image_to_jpeg_bytes(
+    img: Image.Image,
+    quality: int = 95,
+    max_dim: Optional[int] = None,
+) -> bytes:
     """
     Convert PIL Image to JPEG bytes safely.
     
     Args:
         img: PIL Image object
+        quality: JPEG quality (1-95)
+        max_dim: Downscale so the long side is at most this many pixels
         
     Returns:
         JPEG bytes
     """
     # Ensure RGB before save
     img = ensure_rgb(img)
+    if max_dim and max(img.size) > max_dim:
+        scale = max_dim / max(img.size)
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        # reducing_gap does a cheap integer reduce() before the final resample
+        img = img.resize(size, Image.BOX, reducing_gap=2.0)
     
     from io import BytesIO
     buf = BytesIO()
-    img.save(buf, format="JPEG", quality=95)
-    buf.seek(0)
+    # Baseline, non-optimized Huffman tables: the fastest encode PIL offers
+    img.save(buf, format="JPEG", quality=quality, optimize=False, progressive=False, subsampling=2)
     return buf.getvalue()
 
 
-def frame_to_jpeg_bytes(frame: np.ndarray) -> bytes:
+def frame_to_jpeg_bytes(
+    frame: np.ndarray,
+    quality: int = 95,
+    max_dim: Optional[int] = None,
+) -> bytes:
     """
     Convert numpy frame to JPEG bytes safely.
     
+    Uses libjpeg-turbo directly when simplejpeg or PyTurboJPEG is
+    installed, then OpenCV, and falls back to PIL.
+    
     Args:
         frame: numpy array (BGR from camera)
+        quality: JPEG quality (1-95)
+        max_dim: Downscale so the long side is at most this many pixels
         
     Returns:
         JPEG bytes
     """
     # Ensure proper format
     frame = ensure_rgb_from_array(frame)
+    if max_dim:
+        frame = downscale_frame(frame, max_dim)
+    if frame.ndim == 2:
+        return image_to_jpeg_bytes(Image.fromarray(frame), quality=quality)
+    
+    # 4:2:0 chroma like PIL/OpenCV; simplejpeg defaults to 4:4:4 and
+    # PyTurboJPEG to 4:2:2, both larger for no gain in analysis
+    if simplejpeg is not None:
+        return simplejpeg.encode_jpeg(
+            np.ascontiguousarray(frame),
+            quality=quality,
+            colorspace="BGR",
+            colorsubsampling="420",
+            fastdct=True,
+        )
+    
+    encoder = get_jpeg_encoder()
+    if encoder is not None:
+        return encoder.encode(
+            np.ascontiguousarray(frame),
+            quality=quality,
+            pixel_format=TJPF_BGR,
+            jpeg_subsample=TJSAMP_420,
+        )
+    
+    # OpenCV takes BGR as-is and skips the PIL/BytesIO copies
+    if cv2 is not None:
+        ok, encoded = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        if ok:
+            return encoded.tobytes()
     
     # Convert to PIL Image (OpenCV uses BGR, PIL expects RGB)
-    img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    img = _bgr_to_pil(frame)
     
-    return image_to_jpeg_bytes(img)
+    return image_to_jpeg_bytes(img, quality=quality)
@@ -12,21 +12,21 @@ except ImportError:
 import numpy as np
 from typing import Tuple, Optional, List, Dict, Any
 import asyncio
+import importlib.util
 import logging
+import threading
 from datetime import datetime
 from models.schemas import DetectionResult
 from app_config.settings import (
     YOLO_MODEL, CONFIDENCE_THRESHOLD, DETECTION_FPS,
-    FRAME_RESIZE_WIDTH, FRAME_RESIZE_HEIGHT,
+    DETECTION_INPUT_WIDTH, DETECTION_INPUT_HEIGHT,
     AR_BUBBLE_COLOR, AR_BUBBLE_THICKNESS, AR_TEXT_SCALE,
 )
 
-# Try importing YOLO, fallback to mock if not available
-try:
-    from ultralytics import YOLO
-    YOLO_AVAILABLE = True
-except ImportError:
-    YOLO_AVAILABLE = False
+# Check for YOLO without importing it; ultralytics pulls in torch, which is
+# only loaded when the vision service is first built
+YOLO_AVAILABLE = importlib.util.find_spec("ultralytics") is not None
+if not YOLO_AVAILABLE:
     logging.warning("⚠️ YOLOv8 not available. Using mock detection.")
 
 
@@ -50,42 +50,95 @@ class LiveVisionService:
     def _init_yolo(self):
         """Initialize YOLO model for food object detection."""
         try:
+            from ultralytics import YOLO
             self.model = YOLO(YOLO_MODEL)
             self.logger.info(f"✅ YOLO model loaded: {YOLO_MODEL}")
         except Exception as e:
             self.logger.error(f"❌ Failed to load YOLO: {e}")
             self.model = None
     
-    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, List[DetectionResult]]:
-        """
-        Process a single video frame.
-        Returns: (annotated_frame, detections)
+    def process_frame(
+        self,
+        frame: np.ndarray,
+        out: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, List[DetectionResult]]:
         """
-        self.frame_count += 1
-        detections = []
+        Process a single video frame: detect every Nth frame, annotate all.
         
-        # Resize frame for faster processing
-        resized_frame = cv2.resize(
-            frame,
-            (FRAME_RESIZE_WIDTH, FRAME_RESIZE_HEIGHT)
-        )
+        Video processors gate ``detect`` per stream by time and call
+        ``annotate`` themselves; this keeps the shared frame-count gate for
+        single-stream callers.
         
+        Returns: (annotated_frame, detections)
+        """
         # Fast-pass detection at set interval
         if self.frame_count % self.detection_interval == 0:
-            detections = self._detect_objects(resized_frame)
-            self.last_detection_time = datetime.now()
+            detections = self.detect(frame)
         else:
             # Use cached detections from last frame
             detections = self.detections_cache
         
-        # Draw AR overlays
-        annotated_frame = self._draw_ar_overlays(resized_frame, detections)
+        annotated_frame = self.annotate(frame, detections, out=out)
         
         # Cache detections
         self.detections_cache = detections
         
         return annotated_frame, detections
     
+    def detect(self, frame: np.ndarray) -> List[DetectionResult]:
+        """
+        Detect objects on a DETECTION_INPUT_WIDTH x DETECTION_INPUT_HEIGHT copy.
+        
+        Returns: detections with boxes in ``frame`` coordinates
+        """
+        small_frame = cv2.resize(
+            frame,
+            (DETECTION_INPUT_WIDTH, DETECTION_INPUT_HEIGHT),
+            interpolation=cv2.INTER_AREA,
+        )
+        detections = self._scale_detections(
+            self._detect_objects(small_frame),
+            frame.shape[1] / DETECTION_INPUT_WIDTH,
+            frame.shape[0] / DETECTION_INPUT_HEIGHT,
+        )
+        self.last_detection_time = datetime.now()
+        return detections
+    
+    def annotate(
+        self,
+        frame: np.ndarray,
+        detections: List[DetectionResult],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Draw AR overlays on a full-resolution copy so the preview stays sharp.
+        
+        ``out`` is an optional uint8 buffer of ``frame``'s shape owned by the
+        caller; when given, the annotated frame is written into it instead of
+        a new array. This service is shared by every stream, so the buffer
+        must be per stream.
+        """
+        self.frame_count += 1
+        if out is not None and out.shape == frame.shape:
+            np.copyto(out, frame)
+            return self._draw_ar_overlays(out, detections, copy=False)
+        return self._draw_ar_overlays(frame, detections)
+    
+    @staticmethod
+    def _scale_detections(
+        detections: List[DetectionResult], scale_x: float, scale_y: float
+    ) -> List[DetectionResult]:
+        """Map boxes from detection-input coordinates to frame coordinates."""
+        for detection in detections:
+            bbox = detection.bounding_box
+            detection.bounding_box = {
+                'x1': int(bbox['x1'] * scale_x),
+                'y1': int(bbox['y1'] * scale_y),
+                'x2': int(bbox['x2'] * scale_x),
+                'y2': int(bbox['y2'] * scale_y),
+            }
+        return detections
+    
     def _detect_objects(self, frame: np.ndarray) -> List[DetectionResult]:
         """Run YOLO detection or mock detection."""
         if not self.model and YOLO_AVAILABLE:
@@ -146,11 +199,13 @@ class LiveVisionService:
             contours, _ = cv2.findContours(
                 mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
             )
+            # 500px at 640x480, scaled to the detection input size
+            min_area = 500 * frame.shape[0] * frame.shape[1] / (640 * 480)
             
             detections = []
             for contour in contours[:5]:  # Limit to top 5
                 area = cv2.contourArea(contour)
-                if area > 500:  # Minimum area threshold
+                if area > min_area:  # Minimum area threshold
                     x, y, w, h = cv2.boundingRect(contour)
                     
                     detection = DetectionResult(
@@ -179,10 +234,11 @@ class LiveVisionService:
     def _draw_ar_overlays(
         self,
         frame: np.ndarray,
-        detections: List[DetectionResult]
+        detections: List[DetectionResult],
+        copy: bool = True,
     ) -> np.ndarray:
-        """Draw AR overlays on frame."""
-        annotated = frame.copy()
+        """Draw AR overlays on frame (on a copy unless ``copy`` is False)."""
+        annotated = frame.copy() if copy else frame
         
         for detection in detections:
             bbox = detection.bounding_box
@@ -216,7 +272,7 @@ class LiveVisionService:
         
         # Add FPS counter
         if self.last_detection_time:
-            fps_text = f"Detections: {len(detections)} | FPS: {DETECTION_FPS}"
+            fps_text = f"Detections: {len(detections)} | FPS: {DETECTION_FPS:g}"
             cv2.putText(
                 annotated,
                 fps_text,
@@ -267,11 +323,14 @@ class LiveVisionService:
 
 # Global instance
 live_vision = None
+_live_vision_lock = threading.Lock()
 
 
 def get_live_vision_service() -> LiveVisionService:
     """Get or create global live vision service instance."""
     global live_vision
     if live_vision is None:
-        live_vision = LiveVisionService()
+        with _live_vision_lock:
+            if live_vision is None:
+                live_vision = LiveVisionService()
     return live_vision
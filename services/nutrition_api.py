@@ -3,22 +3,43 @@ Unified Nutrition API wrapper for multiple data sources.
 Provides consistent nutrient structure across providers with retry logic and pre-confidence.
 """
 
+import copy
 import os
 import json
 import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 
 import requests
 from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+from urllib3.util.retry import Retry
 
 from database.db_manager import get_db_manager
-from app_config.settings import CACHE_ENABLED
+from app_config.settings import CACHE_ENABLED, CACHE_TTL_SECONDS
 from utils.logging_setup import get_logger
 
 logger = get_logger(__name__)
 
+# In-memory lookups per (source, barcode/query), in front of the SQLite cache
+LOOKUP_CACHE_MAX_ENTRIES = 512
+# Fetchers return None for timeouts as well as "not found", so misses expire fast
+LOOKUP_MISS_TTL_SECONDS = 60
+
+# The only FoodData Central nutrients we map; the response lists 30+ per food
+FOODDATA_NUTRIENTS = frozenset({
+    "Energy",
+    "Carbohydrate, by difference",
+    "Total lipid (fat)",
+    "Protein",
+    "Sugars, total",
+})
+
+# Sources for one lookup are queried concurrently; results still win by priority
+_source_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nutrition-source")
+
 
 def get_pre_confidence(input_type: str) -> float:
     """Get initial confidence score based on input type before API verification.
@@ -37,24 +58,41 @@ def get_pre_confidence(input_type: str) -> float:
     return confidence_map.get(input_type, 0.50)
 
 
-def create_retry_session(max_retries: int = 2, backoff_factor: float = 0.3) -> requests.Session:
-    """Create a requests session with retry logic.
+def create_retry_session(
+    max_retries: int = 2,
+    backoff_factor: float = 0.3,
+    pool_maxsize: int = 16,
+) -> requests.Session:
+    """Create a requests session with retry logic and keep-alive pooling.
     
     Args:
         max_retries: Maximum number of retry attempts
         backoff_factor: Backoff factor for exponential delay
+        pool_maxsize: Keep-alive connections kept per host
     
     Returns:
         Configured requests session
     """
     session = requests.Session()
-    retry_strategy = Retry(
+    retry_kwargs = dict(
         total=max_retries,
         backoff_factor=backoff_factor,
         status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET", "POST"]
+        allowed_methods=["GET", "POST"],
+        # Hand back the last 4xx/5xx response instead of raising, so callers
+        # log the status and move on like any other miss
+        raise_on_status=False,
+    )
+    try:
+        # Jitter spreads retries from concurrent lookups (urllib3 >= 2)
+        retry_strategy = Retry(**retry_kwargs, backoff_jitter=0.1, backoff_max=2)
+    except TypeError:  # pragma: no cover - urllib3 1.x
+        retry_strategy = Retry(**retry_kwargs)
+    adapter = HTTPAdapter(
+        max_retries=retry_strategy,
+        pool_connections=8,  # One pool per provider host
+        pool_maxsize=pool_maxsize,
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
@@ -77,8 +115,33 @@ class NutritionAPI:
         self.nutritionix_app_id = os.getenv("NUTRITIONIX_APP_ID")
         self.nutritionix_api_key = os.getenv("NUTRITIONIX_API_KEY")
         
-        # Create retry-enabled session
+        # Retry-enabled session shared by every source, so TCP/TLS
+        # connections are kept alive between lookups
         self.session = create_retry_session()
+        
+        # (source, key) -> (expires_at, result); misses are cached as None too
+        self._lookups: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self._lookups_lock = threading.Lock()
+
+    def _cached_fetch(self, source: str, key: str, fetch) -> Optional[Dict[str, Any]]:
+        """Call ``fetch(key)`` unless the same source/key was looked up within the TTL."""
+        lookup_key = (source, key)
+        now = time.monotonic()
+        with self._lookups_lock:
+            entry = self._lookups.get(lookup_key)
+            if entry is not None and entry[0] >= now:
+                self._lookups.move_to_end(lookup_key)
+                # Results carry nested dicts (nutrients), so hand out deep copies
+                return copy.deepcopy(entry[1])
+        
+        result = fetch(key)
+        ttl = CACHE_TTL_SECONDS if result else LOOKUP_MISS_TTL_SECONDS
+        with self._lookups_lock:
+            self._lookups[lookup_key] = (now + ttl, copy.deepcopy(result) if result else None)
+            self._lookups.move_to_end(lookup_key)
+            while len(self._lookups) > LOOKUP_CACHE_MAX_ENTRIES:
+                self._lookups.popitem(last=False)
+        return result
 
     def _format_response(
         self,
@@ -167,7 +230,11 @@ class NutritionAPI:
             if resp.status_code == 200:
                 foods = resp.json().get("foods")
                 if foods:
-                    nutrients = {n.get("name"): n.get("amount") for n in foods[0].get("foodNutrients", [])}
+                    nutrients = {
+                        n["name"]: n.get("amount")
+                        for n in foods[0].get("foodNutrients", ())
+                        if n.get("name") in FOODDATA_NUTRIENTS
+                    }
                     logger.info(
                         f"FoodData Central API success for query '{query}'",
                         extra={'duration_ms': duration_ms}
@@ -204,7 +271,7 @@ class NutritionAPI:
             return None
         params = {"app_id": self.edamam_app_id, "app_key": self.edamam_app_key, "ingr": ingredient}
         try:
-            resp = requests.get(self.edamam_url, params=params, timeout=10)
+            resp = self.session.get(self.edamam_url, params=params, timeout=10)
         except Exception:
             return None
         if resp.status_code == 200:
@@ -232,7 +299,7 @@ class NutritionAPI:
         files = {"image": ("capture.jpg", image_bytes, "image/jpeg")}
         params = {"app_id": self.edamam_app_id, "app_key": self.edamam_app_key}
         try:
-            resp = requests.post(self.edamam_vision_url, params=params, files=files, timeout=15)
+            resp = self.session.post(self.edamam_vision_url, params=params, files=files, timeout=15)
         except Exception:
             return None
         if resp.status_code == 200:
@@ -265,7 +332,7 @@ class NutritionAPI:
         }
         data = {"query": query}
         try:
-            resp = requests.post(self.nutritionix_url, headers=headers, json=data, timeout=10)
+            resp = self.session.post(self.nutritionix_url, headers=headers, json=data, timeout=10)
         except Exception:
             return None
         if resp.status_code == 200:
@@ -319,21 +386,34 @@ class NutritionAPI:
         # Attempt API calls
         sources = preferred_sources or ["fooddata", "openfoodfacts", "edamam", "nutritionix"]
         
+        calls = []
         for source in sources:
-            result = None
+            if source == "openfoodfacts" and barcode:
+                calls.append((source, self._cached_fetch, (source, barcode, self.fetch_from_openfoodfacts)))
+            elif source == "fooddata" and query:
+                calls.append((source, self._cached_fetch, (source, query, self.fetch_from_fooddata)))
+            elif source == "edamam" and query:
+                calls.append((source, self._cached_fetch, (source, query, self.fetch_from_edamam)))
+            elif source == "edamam_vision" and image_bytes:
+                # Image bytes never repeat exactly, so vision lookups are not memoized
+                calls.append((source, self.fetch_from_edamam_vision, (image_bytes,)))
+            elif source == "nutritionix" and query:
+                calls.append((source, self._cached_fetch, (source, query, self.fetch_from_nutritionix)))
+        
+        # Latency is the slowest applicable source instead of the sum of misses
+        futures = []
+        if len(calls) > 1:
+            futures = [_source_executor.submit(fn, *args) for _, fn, args in calls]
+            calls = [(source, future.result, ()) for (source, _, _), future in zip(calls, futures)]
+        
+        # Walk results in priority order so the preferred source still wins
+        for source, fn, args in calls:
             try:
-                if source == "openfoodfacts" and barcode:
-                    result = self.fetch_from_openfoodfacts(barcode)
-                elif source == "fooddata" and query:
-                    result = self.fetch_from_fooddata(query)
-                elif source == "edamam" and query:
-                    result = self.fetch_from_edamam(query)
-                elif source == "edamam_vision" and image_bytes:
-                    result = self.fetch_from_edamam_vision(image_bytes)
-                elif source == "nutritionix" and query:
-                    result = self.fetch_from_nutritionix(query)
+                result = fn(*args)
                     
                 if result:
+                    for future in futures:
+                        future.cancel()
                     result["is_cached"] = False
                     if cache_key and CACHE_ENABLED:
                         db.save_nutrition_cache(cache_key, result)
@@ -353,3 +433,23 @@ class NutritionAPI:
             "timestamp": datetime.utcnow().isoformat(),
             "raw": None
         }
+
+
+# Global instance
+nutrition_api = None
+_nutrition_api_lock = threading.Lock()
+
+
+def get_nutrition_api() -> NutritionAPI:
+    """
+    Get or create the global nutrition API client.
+    
+    Shared across reruns and sessions so env lookups and the retrying HTTP
+    session are set up once instead of per session.
+    """
+    global nutrition_api
+    if nutrition_api is None:
+        with _nutrition_api_lock:
+            if nutrition_api is None:
+                nutrition_api = NutritionAPI()
+    return nutrition_api
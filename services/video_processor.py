@@ -6,7 +6,9 @@ Separates processing logic from UI concerns.
 
 import queue
 import logging
-from typing import List, Optional, Dict, Any
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Tuple
 import numpy as np
 from datetime import datetime
 
@@ -18,10 +20,75 @@ except ImportError:
     WEBRTC_AVAILABLE = False
     VideoProcessorBase = object  # Fallback
 
+# Reusable swscale context; older PyAV builds lack it and reformat per frame
+try:
+    from av.video.reformatter import VideoReformatter
+except ImportError:
+    VideoReformatter = None
+
+from app_config.settings import DETECTION_FPS
 from services.live_vision import get_live_vision_service
 from services.barcode_scanner import get_barcode_scanner
 from models.schemas import DetectionResult
 
+# Barcode decoding (and the product lookup behind it) runs off the frame thread
+# so a slow scan never stalls the video stream
+_barcode_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="barcode-scan")
+
+
+def _put_latest(q: queue.Queue, item: Any) -> int:
+    """
+    Put ``item`` without blocking, dropping the oldest entry if ``q`` is full.
+    
+    Returns:
+        Number of unread entries dropped to make room
+    """
+    dropped = 0
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                q.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                pass
+
+
+def frame_to_bgr(frame: "av.VideoFrame", reformatter=None) -> np.ndarray:
+    """
+    BGR pixels of a video frame without the copy ``to_ndarray`` makes.
+    
+    WebRTC frames arrive as YUV, so they are converted first, through
+    ``reformatter`` when given (it keeps its swscale context between frames).
+    Row padding is sliced off rather than copied away, so the result may be
+    a non-contiguous view of the frame's buffer; it keeps that buffer alive.
+    
+    Args:
+        frame: Decoded video frame
+        reformatter: Optional VideoReformatter reused across frames
+        
+    Returns:
+        (height, width, 3) uint8 array
+    """
+    if frame.format.name != "bgr24":
+        if reformatter is not None:
+            frame = reformatter.reformat(frame, format="bgr24")
+        else:
+            frame = frame.reformat(format="bgr24")
+    plane = frame.planes[0]
+    arr = np.frombuffer(plane, dtype=np.uint8)
+    line_size = abs(plane.line_size)
+    row_bytes = frame.width * 3
+    if line_size != row_bytes:
+        arr = arr.reshape(-1, line_size)[:frame.height, :row_bytes]
+    return arr.reshape(frame.height, frame.width, 3)
+
+
+# Weight of the newest sample in the frame timing moving averages
+_TIMING_EMA_ALPHA = 0.1
+
 
 class BioGuardVideoProcessor(VideoProcessorBase):
     """
@@ -36,23 +103,43 @@ class BioGuardVideoProcessor(VideoProcessorBase):
         self.barcode_scanner = get_barcode_scanner()
         
         # Result queues (thread-safe communication with UI)
-        self.detection_queue = queue.Queue(maxsize=10)
+        # Depth 1: the UI only ever wants the newest detections, not a backlog
+        self.detection_queue = queue.Queue(maxsize=1)
         self.barcode_queue = queue.Queue(maxsize=5)
         self.frame_queue = queue.Queue(maxsize=2)  # For capture
         
         # Processing state
         self.frame_count = 0
-        self.barcode_scan_interval = 30  # Scan every 30 frames
+        # Detection and barcode scans run at most DETECTION_FPS times a second;
+        # frames in between only get the last boxes drawn on them
+        self.detect_interval = 1.0 / DETECTION_FPS
+        self._last_detect: Optional[float] = None
         self.is_scanning = True
         self.last_barcode = None
+        self._barcode_future: Optional[Future] = None
+        self._reformatter = VideoReformatter() if VideoReformatter is not None else None
+        # Overlay buffer reused every frame; from_ndarray copies out of it
+        self._scratch: Optional[np.ndarray] = None
         
         # Cache for latest data
         self.current_detections: List[DetectionResult] = []
+        # Overwritten in place by the next frame
         self.annotated_frame: Optional[np.ndarray] = None
+        # Latest raw frame and its detections, swapped in as one tuple so the
+        # UI thread never pairs a frame with another frame's boxes
+        self._latest: Optional[Tuple[np.ndarray, List[DetectionResult]]] = None
+        
+        # Backpressure metrics: if processing takes longer than the gap between
+        # frames, the receiver falls behind and the latest frame goes stale
+        self._last_frame_at: Optional[float] = None
+        self.frame_interval_ms = 0.0
+        self.processing_ms = 0.0
+        self.detections_dropped = 0
+        self.barcode_scans_skipped = 0
         
         self.logger.info("✅ BioGuardVideoProcessor initialized")
     
-    def recv(self, frame: av.VideoFrame) -> av.VideoFrame:
+    def recv(self, frame: "av.VideoFrame") -> "av.VideoFrame":
         """
         Process incoming video frame.
         This is called for every frame from the camera.
@@ -63,32 +150,57 @@ class BioGuardVideoProcessor(VideoProcessorBase):
         Returns:
             Processed frame with AR overlays
         """
+        started = time.monotonic()
+        if self._last_frame_at is not None:
+            self.frame_interval_ms += _TIMING_EMA_ALPHA * (
+                (started - self._last_frame_at) * 1000 - self.frame_interval_ms
+            )
+        self._last_frame_at = started
         try:
-            # Convert to numpy array
-            img = frame.to_ndarray(format="bgr24")
+            # Convert to numpy array (a view, not a copy, of the frame buffer)
+            img = frame_to_bgr(frame, self._reformatter)
             
-            # Process frame with vision service
-            annotated_img, detections = self.vision_service.process_frame(img)
+            # Detect on schedule, otherwise reuse this stream's last boxes
+            scan_due = (
+                self._last_detect is None
+                or started - self._last_detect >= self.detect_interval
+            )
+            if scan_due:
+                self._last_detect = started
+                detections = self.vision_service.detect(img)
+            else:
+                detections = self.current_detections
+            
+            if self._scratch is None or self._scratch.shape != img.shape:
+                self._scratch = np.empty(img.shape, dtype=np.uint8)
+            annotated_img = self.vision_service.annotate(img, detections, out=self._scratch)
             
             # Update cache
             self.current_detections = detections
             self.annotated_frame = annotated_img
+            self._latest = (img, detections)
             self.frame_count += 1
             
-            # Push detections to queue (non-blocking)
+            # Push detections, replacing any result the UI has not read yet
             if detections:
-                try:
-                    self.detection_queue.put_nowait({
-                        'detections': detections,
-                        'frame_id': self.frame_count,
-                        'timestamp': datetime.now().isoformat(),
-                    })
-                except queue.Full:
-                    pass  # Skip if queue is full
+                self.detections_dropped += _put_latest(self.detection_queue, {
+                    'detections': detections,
+                    'frame_id': self.frame_count,
+                    'timestamp': datetime.now().isoformat(),
+                })
+            
+            # Barcode scanning on the same schedule, skipped while a scan is in flight
+            if self.is_scanning and scan_due:
+                if self._barcode_future is None or self._barcode_future.done():
+                    self._barcode_future = _barcode_executor.submit(self._scan_barcode, img)
+                else:
+                    self.barcode_scans_skipped += 1
             
-            # Barcode scanning at intervals
-            if self.is_scanning and self.frame_count % self.barcode_scan_interval == 0:
-                self._scan_barcode(img)
+            if self.frame_count % 300 == 0 and self.processing_ms > self.frame_interval_ms:
+                self.logger.warning(
+                    f"⚠️ Frame processing falling behind: {self.processing_ms:.1f}ms "
+                    f"per frame, frames every {self.frame_interval_ms:.1f}ms"
+                )
             
             # Convert back to VideoFrame
             return av.VideoFrame.from_ndarray(annotated_img, format="bgr24")
@@ -97,11 +209,15 @@ class BioGuardVideoProcessor(VideoProcessorBase):
             self.logger.error(f"❌ Frame processing error: {e}")
             # Return original frame on error
             return frame
+        finally:
+            self.processing_ms += _TIMING_EMA_ALPHA * (
+                (time.monotonic() - started) * 1000 - self.processing_ms
+            )
     
     def _scan_barcode(self, frame: np.ndarray) -> None:
         """Scan frame for barcodes."""
         try:
-            barcode_result = self.barcode_scanner.scan_frame(frame)
+            barcode_result = self.barcode_scanner.scan_barcode(frame)
             
             if barcode_result and barcode_result != self.last_barcode:
                 self.last_barcode = barcode_result
@@ -123,33 +239,34 @@ class BioGuardVideoProcessor(VideoProcessorBase):
         """
         Capture current high-quality frame for analysis.
         
+        Reads the latest frame slot kept by ``recv`` (no waiting on the
+        stream) and crops the full-resolution camera frame, not the resized
+        one with AR overlays drawn on it.
+        
         Returns:
             Captured frame or None if not available
         """
-        if self.annotated_frame is not None and self.current_detections:
-            # Get bounding box of first detection
-            bbox = self.current_detections[0].bounding_box if self.current_detections else None
-            
-            # Capture high-quality region
-            captured = self.vision_service.capture_high_quality_frame(
-                self.annotated_frame,
-                bbox
-            )
-            
-            # Push to frame queue
-            try:
-                self.frame_queue.put_nowait({
-                    'frame': captured,
-                    'detections': self.current_detections,
-                    'timestamp': datetime.now().isoformat(),
-                })
-                self.logger.info("📸 Frame captured for analysis")
-                return captured
-            except queue.Full:
-                self.logger.warning("⚠️ Frame queue full")
-                return captured
-                
-        return None
+        latest = self._latest
+        if latest is None or not latest[1]:
+            return None
+        
+        img, detections = latest
+        # Boxes are already in raw frame coordinates
+        captured = self.vision_service.capture_high_quality_frame(
+            img, detections[0].bounding_box
+        )
+        
+        # Push to frame queue
+        try:
+            self.frame_queue.put_nowait({
+                'frame': captured,
+                'detections': detections,
+                'timestamp': datetime.now().isoformat(),
+            })
+            self.logger.info("📸 Frame captured for analysis")
+        except queue.Full:
+            self.logger.warning("⚠️ Frame queue full")
+        return captured
     
     def get_detection_result(self, timeout: float = 0.1) -> Optional[Dict[str, Any]]:
         """
@@ -213,6 +330,17 @@ class BioGuardVideoProcessor(VideoProcessorBase):
             },
             'scanning_enabled': self.is_scanning,
             'last_barcode': self.last_barcode,
+            'backpressure': {
+                'latest_frame_age_ms': (
+                    round((time.monotonic() - self._last_frame_at) * 1000, 1)
+                    if self._last_frame_at is not None
+                    else None
+                ),
+                'frame_interval_ms': round(self.frame_interval_ms, 1),
+                'processing_ms': round(self.processing_ms, 1),
+                'detections_dropped': self.detections_dropped,
+                'barcode_scans_skipped': self.barcode_scans_skipped,
+            },
         }
     
     def clear_queues(self) -> None:
@@ -0,0 +1,386 @@
+"""
+Tests for DBManager SQLite storage (database/db_manager.py)
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+import database.db_manager as db_module
+from database.db_manager import DBManager, _UserCache
+
+
+# users and food_analysis as created before the integer-timestamp migration
+LEGACY_SCHEMA = """
+    CREATE TABLE users (
+        user_id TEXT PRIMARY KEY,
+        name TEXT,
+        email TEXT,
+        picture TEXT,
+        provider TEXT,
+        email_verified BOOLEAN,
+        age INTEGER,
+        weight REAL,
+        height REAL,
+        allergies TEXT,
+        medical_conditions TEXT,
+        dietary_preferences TEXT,
+        health_sync_enabled BOOLEAN DEFAULT 0,
+        region TEXT,
+        preferred_sources TEXT,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    );
+    CREATE TABLE food_analysis (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT,
+        product TEXT,
+        health_score INTEGER,
+        nova_score INTEGER,
+        verdict TEXT,
+        raw_data TEXT,
+        data_source TEXT,
+        nutrients TEXT,
+        barcode TEXT,
+        created_at TIMESTAMP
+    );
+"""
+
+
+def _seed_legacy_db(path, user_version, users, analyses=()):
+    """Create a database file in an older schema version with the given rows."""
+    with sqlite3.connect(path) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+        conn.executemany(
+            "INSERT INTO users (user_id, name, allergies, medical_conditions,"
+            " dietary_preferences, preferred_sources, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            users,
+        )
+        conn.executemany(
+            "INSERT INTO food_analysis (user_id, product, health_score, created_at)"
+            " VALUES (?, ?, ?, ?)",
+            analyses,
+        )
+        conn.execute(f"PRAGMA user_version = {user_version}")
+    conn.close()
+
+
+def _iso_to_us(iso):
+    """Naive-UTC ISO string to integer microseconds since the epoch."""
+    return int(datetime.fromisoformat(iso).replace(tzinfo=timezone.utc).timestamp() * 1_000_000)
+
+
+@pytest.fixture
+def make_db(tmp_path, monkeypatch):
+    """Build DBManagers backed by files under a temporary directory."""
+    db_path = tmp_path / "bioguard.db"
+    monkeypatch.setattr(db_module, "DATABASE_PATH", str(db_path))
+    monkeypatch.setattr(db_module, "GRAPH_DB_PATH", str(tmp_path / "graph_db"))
+    monkeypatch.setattr(db_module, "VECTOR_DB_PATH", str(tmp_path / "chroma_db"))
+    monkeypatch.setattr(db_module, "ANALYSIS_STORE_PATH", str(tmp_path / "analysis_store"))
+    managers = []
+
+    def factory():
+        db = DBManager()
+        managers.append(db)
+        return db
+
+    factory.db_path = str(db_path)
+    yield factory
+
+    for db in managers:
+        db.flush_vector_writes()
+        db._pool.close()
+
+
+class TestBatchedWrites:
+    """Test batched food-analysis and federated-update saves."""
+
+    def test_food_analyses_batch_round_trip(self, make_db):
+        """Test a batch of analyses is stored and read back in full."""
+        db = make_db()
+        analyses = [
+            {'product': 'Oat bar', 'health_score': 64, 'verdict': 'SAFE'},
+            {'product': 'Cola', 'health_score': '12', 'nova_score': '4', 'verdict': 'DANGER'},
+            {'product': 'Chips', 'health_score': 'n/a'},
+        ]
+
+        assert db.save_food_analyses_batch('u1', analyses) is True
+
+        history = db.get_user_history('u1', limit=10)
+        assert sorted(row['product'] for row in history) == ['Chips', 'Cola', 'Oat bar']
+        by_product = {row['product']: row for row in history}
+        assert by_product['Cola']['health_score'] == 12
+        assert by_product['Cola']['nova_score'] == 4
+        assert by_product['Chips']['health_score'] == 0
+        assert by_product['Chips']['verdict'] == 'UNKNOWN'
+
+    def test_batch_save_invalidates_history_cache(self, make_db):
+        """Test a cached history read sees rows saved afterwards."""
+        db = make_db()
+        db.save_food_analysis('u1', {'product': 'First'})
+        assert len(db.get_user_history('u1')) == 1
+
+        db.save_food_analyses_batch('u1', [{'product': 'Second'}, {'product': 'Third'}])
+
+        assert len(db.get_user_history('u1')) == 3
+
+    def test_federated_updates_batch_round_trip(self, make_db):
+        """Test a round of federated updates is written in one batch."""
+        db = make_db()
+        updates = [
+            {'client_id': f'client-{i}', 'model_weights': {'w': i}, 'accuracy': 0.5 + i / 10}
+            for i in range(3)
+        ]
+
+        assert db.save_federated_updates_batch(updates) is True
+
+        with sqlite3.connect(make_db.db_path) as conn:
+            rows = conn.execute(
+                "SELECT client_id, model_weights, accuracy FROM fl_updates ORDER BY id"
+            ).fetchall()
+        assert [row[0] for row in rows] == ['client-0', 'client-1', 'client-2']
+        assert json.loads(rows[2][1]) == {'w': 2}
+        assert rows[1][2] == pytest.approx(0.6)
+
+    def test_invalid_batch_is_rejected(self, make_db):
+        """Test a malformed update fails the batch without writing any of it."""
+        db = make_db()
+        updates = [
+            {'client_id': 'ok', 'model_weights': {}, 'accuracy': 0.9},
+            {'client_id': 'missing-fields'},
+        ]
+
+        assert db.save_federated_updates_batch(updates) is False
+
+        with sqlite3.connect(make_db.db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM fl_updates").fetchone()[0] == 0
+
+
+class TestUserCache:
+    """Test the TTL/LRU user profile cache."""
+
+    def test_cached_user_is_invalidated_by_save_user(self, make_db):
+        """Test an updated profile is served after save_user, not the cached one."""
+        db = make_db()
+        db.save_user({'user_id': 'u1', 'name': 'Ada', 'allergies': ['peanuts']})
+        assert db.get_user('u1')['name'] == 'Ada'
+
+        db.save_user({'user_id': 'u1', 'name': 'Grace', 'allergies': ['dairy']})
+
+        user = db.get_user('u1')
+        assert user['name'] == 'Grace'
+        assert user['allergies'] == ['dairy']
+
+    def test_cached_user_is_invalidated_by_settings_update(self, make_db):
+        """Test update_user_settings drops the cached profile."""
+        db = make_db()
+        db.save_user({'user_id': 'u1', 'region': 'eu'})
+        assert db.get_user('u1')['region'] == 'eu'
+
+        db.update_user_settings('u1', region='us', preferred_sources=['usda'])
+
+        user = db.get_user('u1')
+        assert user['region'] == 'us'
+        assert user['preferred_sources'] == ['usda']
+
+    def test_get_user_is_served_from_cache(self, make_db):
+        """Test a repeated get_user does not go back to SQLite."""
+        db = make_db()
+        db.save_user({'user_id': 'u1', 'name': 'Ada'})
+        db.get_user('u1')
+
+        # Change the row behind the cache's back; the cached copy still answers
+        with sqlite3.connect(make_db.db_path) as conn:
+            conn.execute("UPDATE users SET name = 'Changed' WHERE user_id = 'u1'")
+
+        assert db.get_user('u1')['name'] == 'Ada'
+
+    def test_returned_profile_is_a_copy(self, make_db):
+        """Test mutating a returned profile does not leak into the cache."""
+        db = make_db()
+        db.save_user({'user_id': 'u1', 'allergies': ['peanuts']})
+
+        db.get_user('u1')['allergies'].append('shellfish')
+
+        assert db.get_user('u1')['allergies'] == ['peanuts']
+
+    def test_entries_expire_after_ttl(self):
+        """Test an entry past its TTL is treated as missing."""
+        cache = _UserCache(max_entries=4, ttl_seconds=-1)
+        cache.put('u1', {'name': 'Ada'})
+
+        assert cache.get('u1') is None
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the cache evicts the least recently read entry when full."""
+        cache = _UserCache(max_entries=2, ttl_seconds=60)
+        cache.put('u1', {'name': 'Ada'})
+        cache.put('u2', {'name': 'Grace'})
+        cache.get('u1')
+
+        cache.put('u3', {'name': 'Linus'})
+
+        assert cache.get('u2') is None
+        assert cache.get('u1') == {'name': 'Ada'}
+        assert cache.get('u3') == {'name': 'Linus'}
+
+
+class TestTimestampMigration:
+    """Test the user_version 1 migration of ISO timestamps to microseconds."""
+
+    def test_iso_timestamps_become_integer_microseconds(self, make_db):
+        """Test existing ISO strings are rewritten in place as epoch microseconds."""
+        created = '2024-03-01T12:30:45.123456'
+        analysed = '2023-12-31T23:59:59'
+        _seed_legacy_db(
+            make_db.db_path,
+            user_version=0,
+            users=[('u1', 'Ada', None, None, None, '[]', created, created)],
+            analyses=[('u1', 'Oat bar', 64, analysed)],
+        )
+
+        db = make_db()
+
+        with sqlite3.connect(make_db.db_path) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] >= 1
+            user_created, user_updated = conn.execute(
+                "SELECT created_at, updated_at FROM users WHERE user_id = 'u1'"
+            ).fetchone()
+            (analysis_created,) = conn.execute(
+                "SELECT created_at FROM food_analysis"
+            ).fetchone()
+        # julianday() keeps millisecond precision
+        assert isinstance(user_created, int)
+        assert user_created == pytest.approx(_iso_to_us(created), abs=1000)
+        assert user_updated == user_created
+        assert analysis_created == pytest.approx(_iso_to_us(analysed), abs=1000)
+
+        history = db.get_user_history('u1')
+        assert history[0]['product'] == 'Oat bar'
+        assert history[0]['created_at'].startswith('2023-12-31T23:59:59')
+
+    def test_migrated_database_is_left_alone(self, make_db):
+        """Test reopening an up-to-date database does not rewrite its rows."""
+        make_db().save_food_analysis('u1', {'product': 'Oat bar'})
+        with sqlite3.connect(make_db.db_path) as conn:
+            before = conn.execute("SELECT created_at FROM food_analysis").fetchall()
+
+        make_db()
+
+        with sqlite3.connect(make_db.db_path) as conn:
+            assert conn.execute("SELECT created_at FROM food_analysis").fetchall() == before
+
+
+class TestProfileListMigration:
+    """Test the user_version 2 migration of JSON profile lists to side tables."""
+
+    def test_json_lists_move_to_side_tables(self, make_db):
+        """Test JSON list columns are copied in order and then cleared."""
+        _seed_legacy_db(
+            make_db.db_path,
+            user_version=1,
+            users=[
+                ('u1', 'Ada', '["peanuts", "dairy"]', '["diabetes"]', '[]', '["usda"]', 1, 1),
+                ('u2', 'Grace', 'not json', None, '["vegan"]', '[]', 1, 1),
+            ],
+        )
+
+        db = make_db()
+
+        with sqlite3.connect(make_db.db_path) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+            assert conn.execute(
+                "SELECT user_id, position, value FROM user_allergies ORDER BY user_id, position"
+            ).fetchall() == [('u1', 0, 'peanuts'), ('u1', 1, 'dairy')]
+            assert conn.execute(
+                "SELECT COUNT(*) FROM users"
+                " WHERE allergies IS NOT NULL OR medical_conditions IS NOT NULL"
+                " OR dietary_preferences IS NOT NULL"
+            ).fetchone()[0] == 0
+            # Timestamps were already integers and must not be touched again
+            assert conn.execute("SELECT created_at FROM users WHERE user_id = 'u1'").fetchone()[0] == 1
+
+        ada = db.get_user('u1')
+        assert ada['allergies'] == ['peanuts', 'dairy']
+        assert ada['medical_conditions'] == ['diabetes']
+        assert ada['dietary_preferences'] == []
+        assert ada['preferred_sources'] == ['usda']
+
+        grace = db.get_user('u2')
+        assert grace['allergies'] == []
+        assert grace['dietary_preferences'] == ['vegan']
+
+    def test_full_upgrade_from_first_schema(self, make_db):
+        """Test a version 0 database runs both migrations in one open."""
+        created = '2024-03-01T12:30:45'
+        _seed_legacy_db(
+            make_db.db_path,
+            user_version=0,
+            users=[('u1', 'Ada', '["peanuts"]', '["hypertension"]', None, '[]', created, created)],
+        )
+
+        db = make_db()
+
+        user = db.get_user('u1')
+        assert user['allergies'] == ['peanuts']
+        assert user['medical_conditions'] == ['hypertension']
+        with sqlite3.connect(make_db.db_path) as conn:
+            (created_at,) = conn.execute("SELECT created_at FROM users").fetchone()
+        assert created_at == pytest.approx(_iso_to_us(created), abs=1000)
+
+    def test_saved_lists_round_trip(self, make_db):
+        """Test profile lists written after the migration keep their order."""
+        db = make_db()
+        db.save_user({
+            'user_id': 'u1',
+            'allergies': ['shellfish', 'peanuts', 'dairy'],
+            'medical_conditions': ['diabetes'],
+        })
+
+        user = db.get_user('u1')
+        assert user['allergies'] == ['shellfish', 'peanuts', 'dairy']
+        assert user['medical_conditions'] == ['diabetes']
+        assert user['dietary_preferences'] == []
+
+    def test_null_and_non_string_items_are_normalized(self, make_db):
+        """Test None items are dropped and other items are stored as text."""
+        db = make_db()
+
+        assert db.save_user({
+            'user_id': 'u1',
+            'allergies': ['peanuts', None, 3],
+            'medical_conditions': [None],
+        }) is True
+
+        user = db.get_user('u1')
+        assert user['allergies'] == ['peanuts', '3']
+        assert user['medical_conditions'] == []
+
+    def test_migration_normalizes_items_like_save_user(self, make_db):
+        """Test migrated JSON lists match what save_user would store for the same items."""
+        _seed_legacy_db(
+            make_db.db_path,
+            user_version=1,
+            users=[('u1', 'Ada', '["peanuts", null, 3, true]', '[null]', None, '[]', 1, 1)],
+        )
+
+        db = make_db()
+        migrated = db.get_user('u1')
+        db.save_user({
+            'user_id': 'u2',
+            'allergies': ['peanuts', None, 3, True],
+            'medical_conditions': [None],
+        })
+        saved = db.get_user('u2')
+
+        assert migrated['allergies'] == saved['allergies'] == ['peanuts', '3', 'True']
+        assert migrated['medical_conditions'] == saved['medical_conditions'] == []
+        with sqlite3.connect(make_db.db_path) as conn:
+            positions = conn.execute(
+                "SELECT position FROM user_allergies WHERE user_id = 'u1' ORDER BY position"
+            ).fetchall()
+        assert positions == [(0,), (1,), (2,)]
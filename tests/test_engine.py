@@ -9,10 +9,14 @@ from unittest.mock import Mock, patch, AsyncMock
 from services.engine import (
     analyze_image,
     analyze_image_sync,
+    needs_image_bytes,
+    submit_analysis,
+    _analyze_image,
     _build_provider_order,
     _analyze_with_gemini,
     _analyze_with_openai,
-    _mock_analysis
+    _mock_analysis,
+    _parse_analysis,
 )
 
 
@@ -43,6 +47,121 @@ class TestProviderOrdering:
             with patch('services.engine.OPENAI_API_KEY', ''):
                 order = _build_provider_order('gemini')
                 assert order == ['mock']
+    
+    def test_needs_image_bytes(self):
+        """Test the image is only needed when a real provider key is set."""
+        with patch('services.engine.GEMINI_API_KEY', ''):
+            with patch('services.engine.OPENAI_API_KEY', ''):
+                assert not needs_image_bytes()
+            with patch('services.engine.OPENAI_API_KEY', 'test-key'):
+                assert needs_image_bytes()
+
+
+class TestHedgedProviders:
+    """Test the hedged provider chain in _analyze_image."""
+    
+    @staticmethod
+    def _fake_provider(delays, failures=()):
+        """Build a _run_provider stand-in with per-provider latency and failures."""
+        async def run(provider, image_bytes):
+            await asyncio.sleep(delays[provider])
+            if provider in failures:
+                raise RuntimeError(f"{provider} down")
+            return {"product": provider, "health_score": 70, "verdict": "SAFE", "warnings": []}
+        return run
+    
+    @pytest.mark.asyncio
+    async def test_preferred_answers_within_hedge_delay(self, sample_image_bytes):
+        """Test the fallback is never started when the preferred provider is fast."""
+        run = AsyncMock(side_effect=self._fake_provider({"gemini": 0.01, "openai": 0.01}))
+        with patch('services.engine.GEMINI_API_KEY', 'test-key'), \
+                patch('services.engine.OPENAI_API_KEY', 'test-key-2'), \
+                patch('services.engine.AI_PROVIDER_HEDGE_DELAY_SECONDS', 0.5), \
+                patch('services.engine._run_provider', run):
+            result, provider = await _analyze_image(sample_image_bytes, 'gemini')
+        
+        assert provider == 'gemini'
+        assert result['product'] == 'gemini'
+        assert [c.args[0] for c in run.call_args_list] == ['gemini']
+    
+    @pytest.mark.asyncio
+    async def test_hedge_fires_and_fallback_wins(self, sample_image_bytes):
+        """Test a slow preferred provider is hedged and the faster fallback wins."""
+        run = AsyncMock(side_effect=self._fake_provider({"gemini": 1.0, "openai": 0.01}))
+        with patch('services.engine.GEMINI_API_KEY', 'test-key'), \
+                patch('services.engine.OPENAI_API_KEY', 'test-key-2'), \
+                patch('services.engine.AI_PROVIDER_HEDGE_DELAY_SECONDS', 0.05), \
+                patch('services.engine._run_provider', run):
+            result, provider = await _analyze_image(sample_image_bytes, 'gemini')
+        
+        assert provider == 'openai'
+        assert result['product'] == 'openai'
+        assert [c.args[0] for c in run.call_args_list] == ['gemini', 'openai']
+    
+    @pytest.mark.asyncio
+    async def test_all_providers_fail_falls_back_to_mock(self, sample_image_bytes):
+        """Test mock is used, with the provider errors as warnings, when both fail."""
+        run = AsyncMock(side_effect=self._fake_provider(
+            {"gemini": 0.01, "openai": 0.01}, failures={"gemini", "openai"}
+        ))
+        with patch('services.engine.GEMINI_API_KEY', 'test-key'), \
+                patch('services.engine.OPENAI_API_KEY', 'test-key-2'), \
+                patch('services.engine.AI_PROVIDER_HEDGE_DELAY_SECONDS', 0.05), \
+                patch('services.engine._run_provider', run):
+            result, provider = await _analyze_image(sample_image_bytes, 'openai')
+        
+        assert provider == 'mock'
+        warnings = " ".join(result['warnings'])
+        assert 'mock data' in warnings.lower()
+        assert 'gemini down' in warnings and 'openai down' in warnings
+
+
+class TestParseAnalysis:
+    """Test parsing of provider JSON answers."""
+    
+    FALLBACK = {"product": "Fallback", "health_score": 80, "verdict": "SAFE", "warnings": []}
+    
+    def test_parses_plain_json(self):
+        """Test a well-formed answer is normalized into the result shape."""
+        result = _parse_analysis(
+            '{"product": "Oat bar", "health_score": 140, "verdict": "warning", "warnings": "Sugar"}',
+            self.FALLBACK,
+        )
+        assert result == {
+            "product": "Oat bar",
+            "health_score": 100,
+            "verdict": "WARNING",
+            "warnings": ["Sugar"],
+        }
+    
+    def test_parses_fenced_json(self):
+        """Test JSON wrapped in a markdown code fence is unwrapped."""
+        text = '```json\n{"product": "Oat bar", "health_score": 64, "verdict": "SAFE"}\n```'
+        result = _parse_analysis(text, self.FALLBACK)
+        assert result["product"] == "Oat bar"
+        assert result["health_score"] == 64
+    
+    def test_malformed_json_uses_fallback(self):
+        """Test truncated output returns the fallback with the raw text as warning."""
+        text = '{"product": "Oat bar", "health_sc'
+        result = _parse_analysis(text, self.FALLBACK)
+        assert result["product"] == "Fallback"
+        assert result["warnings"] == [text]
+    
+    def test_non_object_json_uses_fallback(self):
+        """Test a JSON value that is not an object returns the fallback."""
+        result = _parse_analysis('["Oat bar"]', self.FALLBACK)
+        assert result["product"] == "Fallback"
+    
+    def test_bad_score_and_verdict_use_fallback_values(self):
+        """Test unparseable fields fall back individually."""
+        result = _parse_analysis(
+            '{"product": "Oat bar", "health_score": "high", "verdict": "MAYBE"}',
+            self.FALLBACK,
+        )
+        assert result["product"] == "Oat bar"
+        assert result["health_score"] == 80
+        assert result["verdict"] == "SAFE"
 
 
 class TestMockAnalysis:
@@ -106,6 +225,15 @@ class TestImageAnalysis:
                 
                 assert result is not None
                 assert 'product' in result
+    
+    def test_submit_analysis(self, sample_image_bytes):
+        """Test background analysis resolves to the same result shape."""
+        with patch('services.engine.GEMINI_API_KEY', ''):
+            with patch('services.engine.OPENAI_API_KEY', ''):
+                future = submit_analysis(sample_image_bytes, 'gemini')
+                result = future.result(timeout=10)
+                
+                assert 'product' in result
 
 
 class TestGeminiIntegration:
@@ -55,6 +55,28 @@ def test_cache_key_generation():
     assert key3 is None
 
 
+def test_cached_fetch_isolates_nested_results():
+    """Test callers cannot change cached lookups through nested dicts."""
+    from services.nutrition_api import NutritionAPI
+    
+    api = NutritionAPI()
+    calls = []
+    
+    def fetch(key):
+        calls.append(key)
+        return {'product_name': 'Oat bar', 'nutrients': {'sugar': 5}}
+    
+    first = api._cached_fetch('test', '123', fetch)
+    first['nutrients']['sugar'] = 99
+    second = api._cached_fetch('test', '123', fetch)
+    second['nutrients']['sugar'] = 42
+    third = api._cached_fetch('test', '123', fetch)
+    
+    assert calls == ['123']
+    assert third['nutrients'] == {'sugar': 5}
+    assert third is not second
+
+
 if __name__ == "__main__":
     # Run tests manually
     print("Running nutrition API cache tests...")
@@ -11,17 +11,32 @@ from PIL import Image
 
 from ui_components.theme_wheel import get_current_theme
 
+LOGO_PATH = Path(__file__).resolve().parent / "assets" / "logo.png"
+
+
+@lru_cache(maxsize=1)
+def load_page_icon():
+    """Return the logo for st.set_page_config, or the emoji fallback, once per process."""
+    try:
+        image = Image.open(LOGO_PATH)
+        image.load()  # Decode now so the file is not re-read later
+        return image
+    except Exception:
+        return "🧬"
+
 
 @lru_cache(maxsize=1)
 def load_logo_image() -> Optional[Image.Image]:
     """Load branding logo from assets once."""
-    logo_path = Path(__file__).resolve().parent / "assets" / "logo.png"
+    logo_path = LOGO_PATH
     if not logo_path.exists():
         import streamlit as st
         st.warning(f"⚠️ Logo file not found at: {logo_path}")
         return None
     try:
-        return Image.open(logo_path)
+        image = Image.open(logo_path)
+        image.load()
+        return image
     except Exception as e:
         import streamlit as st
         st.warning(f"⚠️ Could not load logo: {e}")
@@ -1,23 +1,26 @@
 """Helper functions for camera view to reduce complexity."""
 
+from collections import deque
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 import streamlit as st
 
+from app_config.settings import ANALYSIS_HISTORY_MAX
 from utils.i18n import t
 
 
 def init_camera_session_state() -> None:
     """Initialize all camera-related session state variables."""
-    if "scan_status" not in st.session_state:
-        st.session_state.scan_status = "searching"
-    if "last_barcode" not in st.session_state:
-        st.session_state.last_barcode = None
-    if "analysis_history" not in st.session_state:
-        st.session_state.analysis_history = []
-    if "last_nutrition_snapshot" not in st.session_state:
-        st.session_state.last_nutrition_snapshot = None
+    state = st.session_state
+    for key, default in (
+        ("scan_status", "searching"),
+        ("last_barcode", None),
+        ("analysis_history", deque(maxlen=ANALYSIS_HISTORY_MAX)),
+        ("last_nutrition_snapshot", None),
+        ("scan_complete_at", 0.0),
+    ):
+        state.setdefault(key, default)
 
 
 def get_status_message(status: str, messages: Dict[str, str]) -> str:
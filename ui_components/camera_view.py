@@ -1,15 +1,24 @@
 """Full-screen AR camera view with WebRTC fix and AI analysis."""
 
 import asyncio
+import hashlib
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from io import BytesIO
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
 
 import numpy as np
 import streamlit as st
 from PIL import Image
 
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
 try:
     import av
     from streamlit_webrtc import (
@@ -22,25 +31,33 @@ try:
     WEBRTC_AVAILABLE = True
 except ImportError:
     WEBRTC_AVAILABLE = False
+    # Keeps LiveVisionProcessor definable; it is only used when WebRTC is available
+    VideoProcessorBase = object
     st.warning(
         "⚠️ streamlit-webrtc is not installed. Camera view will use upload fallback."
     )
 
 from app_config.settings import (
+    ANALYSIS_MAX_DIM,
     DEFAULT_PREFERRED_SOURCES,
     DEFAULT_REGION,
     DETECTION_FPS,
     HEALTH_SYNC_DEFAULT,
     REGIONAL_SOURCE_DEFAULTS,
     SUPPORTED_LANGUAGES,
+    WEBRTC_ICE_SERVERS,
+    WEBRTC_MEDIA_STREAM_CONSTRAINTS,
 )
 from database.db_manager import get_db_manager
 from services.barcode_scanner import get_barcode_scanner
-from services.engine import analyze_image_sync
+from services.engine import analyze_image_sync, needs_image_bytes, warm_up_providers
+from services.graph_engine import get_graph_engine
 from services.health_sync import get_health_sync_service
+from services.image_utils import frame_hash, frame_to_jpeg_bytes, image_to_jpeg_bytes
 from services.live_vision import get_live_vision_service
-from services.nutrition_api import NutritionAPI, get_pre_confidence
+from services.nutrition_api import NutritionAPI, get_nutrition_api, get_pre_confidence
 from services.recommendations import get_recommendations_service
+from services.video_processor import VideoReformatter, frame_to_bgr
 from ui_components.branding import render_brand_watermark
 from ui_components.camera_helpers import (
     extract_confidence_info,
@@ -74,7 +91,7 @@ from ui_components.ui_kit import (
     metric,
     source_badge,
 )
-from utils.i18n import get_lang, t
+from utils.i18n import get_lang, t, translate
 from utils.logging_setup import get_logger, log_user_action
 from utils.validation import (
     ValidationError,
@@ -85,6 +102,13 @@ from utils.validation import (
 
 logger = get_logger(__name__)
 
+# WebRTC settings are static, so build them once instead of on every rerun
+RTC_CONFIG = RTCConfiguration({"iceServers": WEBRTC_ICE_SERVERS}) if WEBRTC_AVAILABLE else None
+MEDIA_STREAM_CONSTRAINTS: Dict[str, Any] = WEBRTC_MEDIA_STREAM_CONSTRAINTS
+
+# How long a finished scan keeps "complete" before the next rerun resets it
+SCAN_RESULT_HOLD_SECONDS = 2.0
+
 
 def _score_breakdown(nutrients: dict) -> list[str]:
     """Generate simple, explainable score breakdown based on nutrients."""
@@ -240,9 +264,8 @@ def _render_full_analysis(result: dict):
                     """, unsafe_allow_html=True)
 
 
-def _inject_camera_css() -> None:
-    """Inject iOS-style camera CSS with grid overlay and modern controls"""
-    css = """
+# Static, so built once at import rather than on every rerun
+CAMERA_CSS = """
     <style>
         /* Scoped: iOS Native Camera - Full Screen */
         .camera-page .scan-stage {
@@ -275,7 +298,6 @@ def _inject_camera_css() -> None:
             height: 100% !important;
             object-fit: cover !important;
             border-radius: 0 !important;
-            transform: scaleX(-1); /* mirror for selfie */
         }
 
         /* Force embedded WebRTC video to fill and sit behind HUD */
@@ -613,14 +635,62 @@ def _inject_camera_css() -> None:
         }
     </style>
     """
-    st.markdown(css, unsafe_allow_html=True)
+
+
+PROGRESS_RING_HTML = """
+            <div class="progress-ring">
+                <svg width="80" height="80">
+                    <circle cx="40" cy="40" r="36"></circle>
+                </svg>
+            </div>
+            """
+
+
+@lru_cache(maxsize=32)
+def _build_hud_html(
+    live: str, status_text: str, analyzing: bool, flash_tip: str, camera_guide: str
+) -> str:
+    """
+    Assemble the HUD overlay, including the scan-stage closing tag.
+    
+    Only a handful of language/status combinations exist, so each is built once.
+    """
+    hud_html = f"""
+        <div class="camera-grid"></div>
+        <div class="scan-overlay"></div>
+        <div class="hud-top">
+            <div class="pill live"><span class="dot"></span>{live}</div>
+            <div class="pill status">{status_text}</div>
+        </div>
+        """
+
+    # Show progress ring when analyzing
+    if analyzing:
+        hud_html += PROGRESS_RING_HTML
+
+    hud_html += f"""
+        <div class="hud-bottom">
+            <div class="side-control" onclick="alert('{flash_tip}')" title="Flash">💡</div>
+            <div class="capture-btn" onclick="console.log('manual capture')" title="Capture">⬤</div>
+            <div class="side-control" onclick="alert('Switch Camera')" title="Switch">🔄</div>
+        </div>
+        <div class="scan-helper">
+            📸 {camera_guide}
+        </div>
+        </div>
+        </div>
+        """
+    return hud_html
+
+
+def _inject_camera_css() -> None:
+    """Inject iOS-style camera CSS with grid overlay and modern controls"""
+    st.markdown(CAMERA_CSS, unsafe_allow_html=True)
 
 
 def _get_nutrition_client() -> NutritionAPI:
-    """Singleton nutrition client stored in session state."""
-    if "nutrition_client" not in st.session_state:
-        st.session_state.nutrition_client = NutritionAPI()
-    return st.session_state.nutrition_client
+    """Process-wide nutrition client shared by all sessions."""
+    return get_nutrition_api()
 
 
 def _get_preferred_sources(region: Optional[str] = None) -> List[str]:
@@ -631,6 +701,10 @@ def _get_preferred_sources(region: Optional[str] = None) -> List[str]:
     return REGIONAL_SOURCE_DEFAULTS.get(region_key, DEFAULT_PREFERRED_SOURCES)
 
 
+# Barcode decoding takes tens of ms; one worker keeps it off the video thread
+_barcode_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="legacy-barcode-scan")
+
+
 class LiveVisionProcessor(VideoProcessorBase):
     """Process video frames with LiveVision service."""
 
@@ -641,18 +715,38 @@ class LiveVisionProcessor(VideoProcessorBase):
         self.analysis_cooldown = 3.0  # seconds
         self.current_detections = []
         self.barcode_data = None
+        self._reformatter = VideoReformatter() if VideoReformatter is not None else None
+        # Overlay buffer reused every frame; from_ndarray copies out of it
+        self._scratch = None
+        # Detection and barcode scans run at most DETECTION_FPS times a second;
+        # frames in between only get the last boxes drawn on them
+        self._detect_interval = 1.0 / DETECTION_FPS
+        self._last_detect = None
+        self._barcode_future: Optional[Future] = None
 
     def recv(self, frame):
         """Process incoming frame."""
-        img = frame.to_ndarray(format="bgr24")
+        # View of the frame buffer; to_ndarray would copy padded rows
+        img = frame_to_bgr(frame, self._reformatter)
 
         # Process with LiveVision
-        annotated_frame, detections = self.vision.process_frame(img)
-        self.current_detections = detections
+        scan_now = time.monotonic()
+        if self._last_detect is None or scan_now - self._last_detect >= self._detect_interval:
+            self._last_detect = scan_now
+            self.current_detections = self.vision.detect(img)
+
+            # Try barcode scanning on the same schedule, off the video thread;
+            # skipped while the previous scan is still running
+            if self._barcode_future is None or self._barcode_future.done():
+                self._barcode_future = _barcode_executor.submit(
+                    self.barcode_scanner.scan_barcode, img
+                )
+                self._barcode_future.add_done_callback(self._on_barcode_scanned)
 
-        # Try barcode scanning periodically
-        if self.vision.frame_count % 30 == 0:  # Every 30 frames
-            self.barcode_data = self.barcode_scanner.scan_barcode(img)
+        detections = self.current_detections
+        if self._scratch is None or self._scratch.shape != img.shape:
+            self._scratch = np.empty(img.shape, dtype=np.uint8)
+        annotated_frame = self.vision.annotate(img, detections, out=self._scratch)
 
         # Auto-trigger analysis if detection found and cooldown passed
         if detections and len(detections) > 0:
@@ -675,6 +769,13 @@ class LiveVisionProcessor(VideoProcessorBase):
 
         return av.VideoFrame.from_ndarray(annotated_frame, format="bgr24")
 
+    def _on_barcode_scanned(self, future: Future) -> None:
+        """Publish a finished barcode scan for the UI to pick up."""
+        try:
+            self.barcode_data = future.result()
+        except Exception as e:
+            logger.error(f"❌ Barcode scan error: {e}")
+
 
 def render_camera_view() -> None:
     """Render live camera view with AR overlays and continuous scanning."""
@@ -700,6 +801,8 @@ def _render_camera_inner() -> None:
 
         # Initialize session state
         init_camera_session_state()
+        # Build provider clients while the user frames the shot
+        warm_up_providers()
         if "preferred_sources" not in st.session_state:
             st.session_state.preferred_sources = _get_preferred_sources()
         if "region" not in st.session_state:
@@ -709,6 +812,15 @@ def _render_camera_inner() -> None:
         if "last_nutrition_snapshot" not in st.session_state:
             st.session_state.last_nutrition_snapshot = None
 
+        # Go back to searching once a finished result has been on screen long
+        # enough; checked per rerun instead of sleeping on the script thread
+        if (
+            st.session_state.scan_status == "complete"
+            and time.time() - st.session_state.scan_complete_at > SCAN_RESULT_HOLD_SECONDS
+        ):
+            st.session_state.scan_status = "searching"
+            st.session_state.last_nutrition_snapshot = None
+
         if not WEBRTC_AVAILABLE:
             _render_upload_fallback()
             return
@@ -763,34 +875,14 @@ def _render_camera_inner() -> None:
                         preferred_sources=st.session_state.preferred_sources,
                     )
 
-        rtc_config = RTCConfiguration(
-            {
-                "iceServers": [
-                    {"urls": ["stun:stun.l.google.com:19302"]},
-                    {"urls": ["stun:stun1.l.google.com:19302"]},
-                    {"urls": ["stun:stun2.l.google.com:19302"]},
-                ]
-            }
-        )
-
-        constraints: Dict[str, Any] = {
-            "video": {
-                "width": {"max": 1280, "ideal": 720},
-                "height": {"max": 720, "ideal": 480},
-                "frameRate": {"max": 30, "ideal": 15},
-                "facingMode": "environment",
-            },
-            "audio": False,
-        }
-
         st.markdown('<div class="scan-stage">', unsafe_allow_html=True)
 
         # Start WebRTC with custom processor
         ctx = webrtc_streamer(
             key="bioguard-ar-live",
             mode=WebRtcMode.SENDRECV,
-            rtc_configuration=rtc_config,
-            media_stream_constraints=constraints,
+            rtc_configuration=RTC_CONFIG,
+            media_stream_constraints=MEDIA_STREAM_CONSTRAINTS,
             video_processor_factory=LiveVisionProcessor,
             desired_playing_state=True,
             video_html_attrs={
@@ -803,40 +895,17 @@ def _render_camera_inner() -> None:
         )
 
         # Dynamic HUD with iOS grid overlay
-        hud_html = f"""
-        <div class="camera-grid"></div>
-        <div class="scan-overlay"></div>
-        <div class="hud-top">
-            <div class="pill live"><span class="dot"></span>{messages['live']}</div>
-            <div class="pill status">{status_text}</div>
-        </div>
-        """
-
-        # Show progress ring when analyzing
-        if st.session_state.scan_status == "analyzing":
-            hud_html += """
-            <div class="progress-ring">
-                <svg width="80" height="80">
-                    <circle cx="40" cy="40" r="36"></circle>
-                </svg>
-            </div>
-            """
-
-        hud_html += f"""
-        <div class="hud-bottom">
-            <div class="side-control" onclick="alert('{messages['flash_tip']}')" title="Flash">💡</div>
-            <div class="capture-btn" onclick="console.log('manual capture')" title="Capture">⬤</div>
-            <div class="side-control" onclick="alert('Switch Camera')" title="Switch">🔄</div>
-        </div>
-        <div class="scan-helper">
-            📸 {messages.get('camera_guide', 'Point camera at product')}
-        </div>
-        </div>
-        """
+        hud_html = _build_hud_html(
+            messages["live"],
+            status_text,
+            st.session_state.scan_status == "analyzing",
+            messages["flash_tip"],
+            messages.get("camera_guide", "Point camera at product"),
+        )
 
         if ctx and ctx.state.playing:
+            # HUD and the scan-stage closing tag go out as one element
             st.markdown(hud_html, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
 
         # Check for pending analysis
         if "pending_analysis_frame" in st.session_state:
@@ -854,43 +923,43 @@ def _render_camera_inner() -> None:
                 del st.session_state.pending_analysis_frame
                 return
 
-            # Show step progress
-            step_progress([t("step_detect"), t("step_analyze"), t("step_results")], active_index=1)
+            # Progress and pre-confidence share one slot, so the finished
+            # progress replaces them in place instead of stacking below
+            steps = [t("step_detect"), t("step_analyze"), t("step_results")]
+            progress_slot = st.empty()
+            with progress_slot.container():
+                step_progress(steps, active_index=1)
 
-            # Show pre-confidence for vision
-            pre_conf = get_pre_confidence("vision")
-            st.markdown(
-                f"""
-            <div style="padding: 12px; background: rgba(59,130,246,0.1); border-radius: 8px; margin: 12px 0;">
-                {badge(t("status_analyzing"), "info", "🔍")}
-                {confidence_badge(pre_conf, "الثقة الأولية")}
-            </div>
-            """,
-                unsafe_allow_html=True,
-            )
+                # Show pre-confidence for vision
+                pre_conf = get_pre_confidence("vision")
+                st.markdown(
+                    f"""
+                <div style="padding: 12px; background: rgba(59,130,246,0.1); border-radius: 8px; margin: 12px 0;">
+                    {badge(t("status_analyzing"), "info", "🔍")}
+                    {confidence_badge(pre_conf, "الثقة الأولية")}
+                </div>
+                """,
+                    unsafe_allow_html=True,
+                )
 
             # Convert frame to bytes
             frame = st.session_state.pending_analysis_frame
             
-            # Ensure frame is BGR or RGB (not RGBA)
-            import cv2 as cv
-            if len(frame.shape) == 3 and frame.shape[2] == 4:
-                # BGRA to BGR
-                frame = cv.cvtColor(frame, cv.COLOR_BGRA2BGR)
-            
-            image = Image.fromarray(frame)
-            # Convert to RGB if needed (Image might be BGR from OpenCV)
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            buf = BytesIO()
-            image.save(buf, format="JPEG", quality=95)
-
             # Perform analysis
             provider = st.session_state.get("ai_provider", "gemini")
 
+            # Frame is BGR(A) from WebRTC; encoded without a PIL round-trip, and
+            # not at all when only the mock provider (which ignores it) would run
+            if needs_image_bytes():
+                image_bytes = frame_to_jpeg_bytes(frame, quality=75, max_dim=ANALYSIS_MAX_DIM)
+                image_key = frame_hash(frame)
+            else:
+                image_bytes, image_key = b"", None
+
             with st.spinner(messages["analyzing"] + "..."):
-                result = analyze_image_sync(buf.getvalue(), preferred_provider=provider)
+                result = analyze_image_sync(
+                    image_bytes, preferred_provider=provider, image_key=image_key
+                )
                 
                 # Log initial result for debugging
                 logger.info(f"Initial AI analysis result keys: {list(result.keys())}")
@@ -902,9 +971,8 @@ def _render_camera_inner() -> None:
 
                 if user_profile and result.get("product"):
                     # Check against knowledge graph
-                    from services.graph_engine import GraphEngine
-
-                    graph_engine = GraphEngine()
+                    # Shared engine, so its conflict cache survives across scans
+                    graph_engine = get_graph_engine()
 
                     ingredients = result.get("ingredients", [])
                     conflicts = graph_engine.find_hidden_conflicts(
@@ -939,10 +1007,8 @@ def _render_camera_inner() -> None:
                         logger.warning("No nutrition snapshot available from API")
                         # Try OCR as fallback
                         try:
-                            from services.barcode_scanner import BarcodeScanner
-                            barcode_scanner = BarcodeScanner()
-                            img_array = np.array(image)
-                            ocr_text = barcode_scanner.extract_text_ocr(img_array)
+                            barcode_scanner = get_barcode_scanner()
+                            ocr_text = barcode_scanner.extract_text_ocr(frame)
                             if ocr_text:
                                 logger.info(f"OCR extracted text: {ocr_text[:100]}...")
                                 nutrition = barcode_scanner.parse_nutrition_label(ocr_text)
@@ -985,7 +1051,8 @@ def _render_camera_inner() -> None:
                 st.session_state.scan_status = "complete"
 
                 # Show step progress complete
-                step_progress([t("step_detect"), t("step_analyze"), t("step_results")], active_index=2)
+                with progress_slot.container():
+                    step_progress(steps, active_index=2)
 
                 # Display result
                 col1, col2 = st.columns([2, 1])
@@ -1018,8 +1085,12 @@ def _render_camera_inner() -> None:
                     render_ingredients_section(result)
 
                 with col2:
+                    # Mock-only runs skipped the encode above; the preview still needs it
+                    preview_bytes = image_bytes or frame_to_jpeg_bytes(
+                        frame, quality=75, max_dim=ANALYSIS_MAX_DIM
+                    )
                     st.image(
-                        image,
+                        preview_bytes,
                         width="stretch",
                         caption=messages["scanned_image"],
                     )
@@ -1107,32 +1178,12 @@ def _render_camera_inner() -> None:
             if "pending_analysis_bbox" in st.session_state:
                 del st.session_state.pending_analysis_bbox
 
-            # Reset status after delay
-            time.sleep(2)
-            st.session_state.scan_status = "searching"
-            st.session_state.last_nutrition_snapshot = None
-            st.rerun()
+            # Reset to searching on a later rerun; sleeping and rerunning here
+            # froze the session and tore down the WebRTC stream
+            st.session_state.scan_complete_at = time.time()
 
         # Manual capture button
-        _, col_b, _ = st.columns([1, 1, 1])
-        with col_b:
-            if st.button(
-                messages["manual_capture"],
-                width="stretch",
-                key="manual_capture_btn",
-            ):
-                if ctx.video_processor:
-                    processor = ctx.video_processor
-                    if (
-                        hasattr(processor, "current_detections")
-                        and processor.current_detections
-                    ):
-                        st.session_state.scan_status = "detected"
-                        st.success(f"✅ {messages['product_detected']}")
-                    else:
-                        st.warning(messages["no_detection"])
-                else:
-                    st.warning(messages["camera_not_ready"])
+        _render_manual_capture(ctx, messages)
 
         # Show barcode if detected
         if ctx.video_processor and hasattr(ctx.video_processor, "barcode_data"):
@@ -1205,7 +1256,7 @@ def _render_camera_inner() -> None:
                     expanded=False,
                 ):
                     for idx, analysis in enumerate(
-                        reversed(st.session_state.analysis_history[-5:])
+                        islice(reversed(st.session_state.analysis_history), 5)
                     ):
                         st.markdown(
                             f"**{idx+1}.** {analysis.get('product', 'Unknown')} - Score: {analysis.get('health_score', 'N/A')}"
@@ -1233,7 +1284,82 @@ def _render_camera_inner() -> None:
         st.markdown("</div>", unsafe_allow_html=True)
 
 
-def _get_ui_messages(language: str = "en") -> Dict[str, str]:
+@st.fragment
+def _render_manual_capture(ctx, messages: Mapping[str, str]) -> None:
+    """
+    Manual capture button.
+    
+    A fragment, so a press reruns only this block instead of re-sending the
+    CSS, HUD and WebRTC component for the whole camera page.
+    """
+    _, col_b, _ = st.columns([1, 1, 1])
+    with col_b:
+        if st.button(
+            messages["manual_capture"],
+            width="stretch",
+            key="manual_capture_btn",
+        ):
+            if ctx.video_processor:
+                processor = ctx.video_processor
+                if (
+                    hasattr(processor, "current_detections")
+                    and processor.current_detections
+                ):
+                    st.session_state.scan_status = "detected"
+                    st.success(f"✅ {messages['product_detected']}")
+                else:
+                    st.warning(messages["no_detection"])
+            else:
+                st.warning(messages["camera_not_ready"])
+
+
+# UI message keys mapped to i18n keys; the rest are English-only literals
+_UI_MESSAGE_KEYS: Mapping[str, str] = MappingProxyType({
+    "live": "scan_title",
+    "searching": "analyzing",
+    "detected": "product_detected",
+    "analyzing": "analyzing",
+    "complete": "analysis_complete",
+    "guide_tip": "guide_tip",
+    "helper_text": "helper_text",
+    "analysis_complete": "analysis_complete",
+    "ingredients": "ingredients",
+    "scanned_image": "scanned_image",
+    "alternatives": "alternatives",
+    "alternatives_message": "alternatives_message",
+    "found_alternatives": "found_alternatives",
+    "healthier_options": "healthier_options",
+    "manual_capture": "manual_capture",
+    "product_detected": "product_detected",
+    "no_detection": "no_detection",
+    "camera_not_ready": "camera_not_ready",
+    "barcode_detected": "barcode_detected",
+    "product_name": "product_name",
+    "brand": "brand",
+    "nutrition_grade": "nutrition_grade",
+    "how_to_scan": "how_to_scan",
+    "scan_instructions": "scan_instructions",
+    "nutrition_details": "nutrition_facts",
+})
+
+_UI_MESSAGE_LITERALS: Mapping[str, str] = MappingProxyType({
+    "flash": "Flash",
+    "guides": "Guides",
+    "flash_tip": "Use flash in low light conditions",
+    "history": "History",
+    "allow_camera": "Please allow camera access to enable automatic scanning",
+})
+
+
+@lru_cache(maxsize=8)
+def _build_ui_messages(lang: str) -> Mapping[str, str]:
+    """Build the read-only message table for one language."""
+    messages = {key: translate(i18n_key, lang) for key, i18n_key in _UI_MESSAGE_KEYS.items()}
+    messages.update(_UI_MESSAGE_LITERALS)
+    return MappingProxyType(messages)
+
+
+def _get_ui_messages(language: str = "en") -> Mapping[str, str]:
     """
     Get UI messages in specified language.
 
@@ -1241,45 +1367,10 @@ def _get_ui_messages(language: str = "en") -> Dict[str, str]:
         language: Language code (ar, en, fr)
 
     Returns:
-        Dictionary of UI messages mapped to i18n keys
+        Read-only mapping of UI messages, built once per language
     """
-    # Map UI message keys to i18n keys
-    from utils.i18n import t, get_lang
-    
-    lang = get_lang()
-    messages = {
-        "live": t("scan_title"),
-        "searching": t("analyzing"),
-        "detected": t("product_detected"),
-        "analyzing": t("analyzing"),
-        "complete": t("analysis_complete"),
-        "flash": "Flash",
-        "guides": "Guides",
-        "flash_tip": "Use flash in low light conditions",
-        "guide_tip": t("guide_tip"),
-        "helper_text": t("helper_text"),
-        "analysis_complete": t("analysis_complete"),
-        "ingredients": t("ingredients"),
-        "scanned_image": t("scanned_image"),
-        "alternatives": t("alternatives"),
-        "alternatives_message": t("alternatives_message"),
-        "found_alternatives": t("found_alternatives"),
-        "healthier_options": t("healthier_options"),
-        "manual_capture": t("manual_capture"),
-        "product_detected": t("product_detected"),
-        "no_detection": t("no_detection"),
-        "camera_not_ready": t("camera_not_ready"),
-        "barcode_detected": t("barcode_detected"),
-        "product_name": t("product_name"),
-        "brand": t("brand"),
-        "nutrition_grade": t("nutrition_grade"),
-        "history": "History",
-        "allow_camera": "Please allow camera access to enable automatic scanning",
-        "how_to_scan": t("how_to_scan"),
-        "scan_instructions": t("scan_instructions"),
-        "nutrition_details": t("nutrition_facts"),
-    }
-    return messages
+    # The active i18n language wins, as it always has
+    return _build_ui_messages(get_lang())
 
 
 def _render_upload_fallback() -> None:
@@ -1304,6 +1395,12 @@ def _render_upload_fallback() -> None:
                 messages.get("analyzing", "Analyze"), width="stretch"
             ):
                 # Convert to bytes
+                # Small RGB JPEG uploads are sent as-is instead of re-encoded
+                is_rgb_jpeg = (
+                    image.format == "JPEG"
+                    and image.mode == "RGB"
+                    and max(image.size) <= ANALYSIS_MAX_DIM
+                )
                 # Ensure image is in RGB mode (JPEG doesn't support transparency)
                 if image.mode != 'RGB':
                     # Handle RGBA, LA, P, etc.
@@ -1315,20 +1412,28 @@ def _render_upload_fallback() -> None:
                     else:
                         image = image.convert('RGB')
                 
-                buf = BytesIO()
-                image.save(buf, format="JPEG", quality=95)
+                if is_rgb_jpeg:
+                    image_bytes = file.getvalue()
+                else:
+                    # Providers do not need more than ANALYSIS_MAX_DIM pixels
+                    image_bytes = image_to_jpeg_bytes(
+                        image, quality=75, max_dim=ANALYSIS_MAX_DIM
+                    )
 
                 # Analyze
                 provider = st.session_state.get("ai_provider", "gemini")
 
                 with st.spinner(messages.get("analyzing", "Analyzing") + "..."):
+                    # Re-uploading the same file reuses the previous result
                     result = analyze_image_sync(
-                        buf.getvalue(), preferred_provider=provider
+                        image_bytes,
+                        preferred_provider=provider,
+                        image_key=hashlib.sha1(image_bytes).hexdigest(),
                     )
 
-                    # Try barcode and OCR
+                    # Try barcode and OCR (read-only view, no extra pixel copy)
                     barcode_scanner = get_barcode_scanner()
-                    img_array = np.array(image)
+                    img_array = np.asarray(image)
 
                     # Try barcode
                     barcode_data = barcode_scanner.scan_barcode(img_array)
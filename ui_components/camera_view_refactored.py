@@ -3,12 +3,16 @@ Simplified Camera View with Separated Processing Logic
 Modern, clean UI focused on core scanning functionality.
 """
 
+import hashlib
+import time
+from collections import deque
 from datetime import datetime
-from io import BytesIO
-from typing import Any, Dict, Optional
+from itertools import islice
+from typing import Any, Dict, Optional, Union
 
 import numpy as np
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 from PIL import Image
 
 import os
@@ -34,12 +38,26 @@ def _is_streamlit_cloud() -> bool:
 # Disable WebRTC on Cloud by default (unstable)
 WEBRTC_ENABLED = WEBRTC_AVAILABLE and not _is_streamlit_cloud()
 
-from app_config.settings import SUPPORTED_LANGUAGES
+from app_config.settings import (
+    ANALYSIS_HISTORY_MAX,
+    ANALYSIS_MAX_DIM,
+    SUPPORTED_LANGUAGES,
+    WEBRTC_ICE_SERVERS,
+    WEBRTC_MEDIA_STREAM_CONSTRAINTS,
+)
 from database.db_manager import get_db_manager
-from services.engine import analyze_image_sync
+from services.engine import analyze_image_sync, submit_analysis, warm_up_providers
+from services.image_utils import frame_hash, frame_to_jpeg_bytes, image_to_jpeg_bytes
 from services.video_processor import BioGuardVideoProcessor, get_video_processor_factory
 from utils.i18n import get_lang, t
 
+# WebRTC settings are static, so build them once instead of on every rerun
+RTC_CONFIG = RTCConfiguration({"iceServers": WEBRTC_ICE_SERVERS}) if WEBRTC_AVAILABLE else None
+MEDIA_STREAM_CONSTRAINTS = WEBRTC_MEDIA_STREAM_CONSTRAINTS
+
+# Seconds between fragment reruns while a capture is being analyzed
+ANALYSIS_POLL_INTERVAL = 0.25
+
 
 def render_camera_view() -> None:
     """
@@ -48,6 +66,9 @@ def render_camera_view() -> None:
     # Initialize session state
     _init_session_state()
 
+    # Build provider clients while the user frames the shot
+    warm_up_providers()
+
     # Get UI messages
     lang = st.session_state.get("language", "en")
     messages = _get_messages(lang)
@@ -63,6 +84,21 @@ def render_camera_view() -> None:
         _render_upload_interface(messages)
         return
 
+    _render_live_camera(messages)
+
+    # Upload fallback
+    with st.expander(messages["upload_option"], expanded=False):
+        _render_upload_interface(messages)
+
+
+@st.fragment
+def _render_live_camera(messages: Dict[str, str]) -> None:
+    """
+    Camera controls, stream and capture handling.
+    
+    Runs as a fragment so toggling scanning or pressing capture reruns only
+    this block instead of the whole app (theme, navigation, other pages).
+    """
     # Camera controls
     col1, col2, col3 = st.columns([1, 2, 1])
 
@@ -78,26 +114,6 @@ def render_camera_view() -> None:
         if st.button(messages["capture"], width="stretch", type="primary"):
             st.session_state.manual_capture = True
 
-    # WebRTC configuration
-    rtc_config = RTCConfiguration(
-        {
-            "iceServers": [
-                {"urls": ["stun:stun.l.google.com:19302"]},
-            ]
-        }
-    )
-
-    # Video constraints
-    constraints = {
-        "video": {
-            "width": {"ideal": 1280},
-            "height": {"ideal": 720},
-            "frameRate": {"ideal": 15},
-            "facingMode": "environment",
-        },
-        "audio": False,
-    }
-
     # Status indicator
     status_placeholder = st.empty()
     _update_status(status_placeholder, st.session_state.scan_status, messages)
@@ -108,8 +124,8 @@ def render_camera_view() -> None:
         ctx = webrtc_streamer(
             key="bioguard-camera",
             mode=WebRtcMode.SENDRECV,
-            rtc_configuration=rtc_config,
-            media_stream_constraints=constraints,
+            rtc_configuration=RTC_CONFIG,
+            media_stream_constraints=MEDIA_STREAM_CONSTRAINTS,
             video_processor_factory=get_video_processor_factory(),
             desired_playing_state=True,
             async_processing=True,
@@ -144,20 +160,17 @@ def render_camera_view() -> None:
         if barcode_result:
             _display_barcode_info(barcode_result, messages)
 
-        # Display stats in sidebar
-        if st.sidebar.checkbox(messages["show_stats"], value=False):
-            stats = processor.get_stats()
-            st.sidebar.json(stats)
+        # Fragments cannot write to the sidebar, so stats render inline
+        if st.checkbox(messages["show_stats"], value=False):
+            st.json(processor.get_stats())
 
     elif ctx and not ctx.state.playing:
         st.info(messages["camera_permission"])
 
-    # Display analysis history
-    _display_history(messages)
+    _poll_pending_analysis(messages)
 
-    # Upload fallback
-    with st.expander(messages["upload_option"], expanded=False):
-        _render_upload_interface(messages)
+    # Display analysis history (inside the fragment so captures show up)
+    _display_history(messages)
 
 
 def _init_session_state() -> None:
@@ -169,15 +182,18 @@ def _init_session_state() -> None:
     if "manual_capture" not in st.session_state:
         st.session_state.manual_capture = False
     if "analysis_history" not in st.session_state:
-        st.session_state.analysis_history = []
+        st.session_state.analysis_history = deque(maxlen=ANALYSIS_HISTORY_MAX)
     if "last_barcode" not in st.session_state:
         st.session_state.last_barcode = None
+    if "pending_analysis" not in st.session_state:
+        st.session_state.pending_analysis = None
+    if "last_capture" not in st.session_state:
+        # (image_key, result, image_bytes) of the last analyzed camera capture
+        st.session_state.last_capture = None
 
 
-def _inject_minimal_css() -> None:
-    """Inject minimal, clean CSS for camera view."""
-    st.markdown(
-        """
+# Static, so built once at import rather than on every rerun
+MINIMAL_CAMERA_CSS = """
     <style>
         /* Video container */
         [data-testid="stWebRtc"] video {
@@ -243,9 +259,12 @@ def _inject_minimal_css() -> None:
             border: 2px solid var(--primary-color);
         }
     </style>
-    """,
-        unsafe_allow_html=True,
-    )
+    """
+
+
+def _inject_minimal_css() -> None:
+    """Inject minimal, clean CSS for camera view."""
+    st.markdown(MINIMAL_CAMERA_CSS, unsafe_allow_html=True)
 
 
 def _update_status(placeholder, status: str, messages: Dict[str, str]) -> None:
@@ -268,69 +287,96 @@ def _update_status(placeholder, status: str, messages: Dict[str, str]) -> None:
 def _handle_capture(
     processor: BioGuardVideoProcessor, messages: Dict[str, str]
 ) -> None:
-    """Handle manual capture and analysis."""
-    st.session_state.scan_status = "analyzing"
+    """Grab a frame and start its analysis in the background."""
+    if st.session_state.get("pending_analysis") is not None:
+        # One analysis at a time; the running one is polled below
+        return
 
-    with st.spinner(messages["analyzing"]):
-        # Capture frame
-        captured_frame = processor.capture_frame()
+    # Capture frame
+    captured_frame = processor.capture_frame()
 
-        if captured_frame is None:
-            st.warning(messages["no_detection"])
-            st.session_state.scan_status = "idle"
-            return
+    if captured_frame is None:
+        st.warning(messages["no_detection"])
+        st.session_state.scan_status = "idle"
+        return
 
-        # Convert to PIL Image
-        frame_rgb = captured_frame
-        if len(frame_rgb.shape) == 3 and frame_rgb.shape[2] == 3:
-            # BGR to RGB
-            frame_rgb = frame_rgb[:, :, ::-1]
+    # Same scene as the last analyzed capture: skip the encode and provider call
+    image_key = frame_hash(captured_frame)
+    last_capture = st.session_state.last_capture
+    if last_capture is not None and last_capture[0] == image_key:
+        _, last_result, last_image_bytes = last_capture
+        st.session_state.scan_status = "complete"
+        _display_analysis_result(last_result, last_image_bytes, messages)
+        return
 
-        pil_image = Image.fromarray(frame_rgb)
+    # Encode the BGR frame directly (libjpeg-turbo when available); the JPEG
+    # doubles as the preview, so no RGB/PIL copy of the frame is made
+    image_bytes = frame_to_jpeg_bytes(captured_frame, quality=75, max_dim=ANALYSIS_MAX_DIM)
+
+    # The provider call runs off the script thread so the stream keeps draining
+    st.session_state.pending_analysis = {
+        "future": submit_analysis(
+            image_bytes,
+            preferred_provider=st.session_state.get("ai_provider", "gemini"),
+            image_key=image_key,
+        ),
+        "image_key": image_key,
+        "image_bytes": image_bytes,
+    }
+    st.session_state.scan_status = "analyzing"
 
-        # Ensure RGB mode for JPEG (handle RGBA/P/LA modes)
-        if pil_image.mode in ("RGBA", "LA") or (pil_image.mode == "P" and "transparency" in pil_image.info):
-            pil_image = pil_image.convert("RGBA").convert("RGB")
-        elif pil_image.mode != "RGB":
-            pil_image = pil_image.convert("RGB")
 
-        # Convert to bytes
-        img_byte_arr = BytesIO()
-        pil_image.save(img_byte_arr, format="JPEG")
-        image_bytes = img_byte_arr.getvalue()
+def _poll_pending_analysis(messages: Dict[str, str]) -> None:
+    """Show the background analysis once it finishes; rerun the fragment until then."""
+    pending = st.session_state.get("pending_analysis")
+    if pending is None:
+        return
 
-        # Analyze with AI
+    future = pending["future"]
+    if not future.done():
+        st.caption(f"🧠 {messages['analyzing']}...")
+        time.sleep(ANALYSIS_POLL_INTERVAL)
         try:
-            analysis_result = analyze_image_sync(image_bytes)
-
-            # Save to history
-            st.session_state.analysis_history.append(
-                {
-                    "timestamp": datetime.now().isoformat(),
-                    "result": analysis_result,
-                    "image": pil_image,
-                }
-            )
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            # Full-app run (e.g. navigated back mid-analysis): no fragment to target
+            st.rerun()
 
-            # Save to database if authenticated
-            if st.session_state.get("authenticated"):
-                db = get_db_manager()
-                db.save_analysis(
-                    user_id=st.session_state.get("user_profile", {}).get(
-                        "email", "guest"
-                    ),
-                    analysis_data=analysis_result,
-                    image_bytes=image_bytes,
-                )
+    st.session_state.pending_analysis = None
+    try:
+        analysis_result = future.result()
+
+        # Save to history
+        st.session_state.analysis_history.append(
+            {
+                "timestamp": datetime.now().isoformat(),
+                "result": analysis_result,
+                "image": pending["image_bytes"],
+            }
+        )
 
-            st.session_state.scan_status = "complete"
+        # Save to database if authenticated
+        if st.session_state.get("authenticated"):
+            db = get_db_manager()
+            db.save_analysis(
+                user_id=st.session_state.get("user_profile", {}).get(
+                    "email", "guest"
+                ),
+                analysis_data=analysis_result,
+                image_bytes=pending["image_bytes"],
+            )
+
+        st.session_state.last_capture = (
+            pending["image_key"], analysis_result, pending["image_bytes"]
+        )
+        st.session_state.scan_status = "complete"
 
-            # Display result
-            _display_analysis_result(analysis_result, pil_image, messages)
+        # Display result
+        _display_analysis_result(analysis_result, pending["image_bytes"], messages)
 
-        except Exception as e:
-            st.error(f"{messages['analysis_error']}: {str(e)}")
-            st.session_state.scan_status = "idle"
+    except Exception as e:
+        st.error(f"{messages['analysis_error']}: {str(e)}")
+        st.session_state.scan_status = "idle"
 
 
 def _display_detection_info(result: Dict[str, Any], messages: Dict[str, str]) -> None:
@@ -391,7 +437,7 @@ def _display_barcode_info(result: Dict[str, Any], messages: Dict[str, str]) -> N
 
 
 def _display_analysis_result(
-    analysis: Dict[str, Any], image: Image.Image, messages: Dict[str, str]
+    analysis: Dict[str, Any], image: Union[Image.Image, bytes], messages: Dict[str, str]
 ) -> None:
     """Display comprehensive analysis result with full nutrition cards."""
     st.markdown('<div class="result-container">', unsafe_allow_html=True)
@@ -487,7 +533,7 @@ def _display_history(messages: Dict[str, str]) -> None:
             expanded=False,
         ):
             for idx, item in enumerate(
-                reversed(st.session_state.analysis_history[-5:])
+                islice(reversed(st.session_state.analysis_history), 5)
             ):
                 result = item.get("result", {})
                 timestamp = item.get("timestamp", "")
@@ -523,19 +569,30 @@ def _render_upload_interface(messages: Dict[str, str]) -> None:
         ):
             with st.spinner(messages["analyzing"]):
                 try:
-                    # Ensure RGB mode for JPEG (handle RGBA/P/LA modes)
-                    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
-                        image = image.convert("RGBA").convert("RGB")
-                    elif image.mode != "RGB":
-                        image = image.convert("RGB")
-
-                    # Convert to bytes
-                    img_byte_arr = BytesIO()
-                    image.save(img_byte_arr, format="JPEG")
-                    image_bytes = img_byte_arr.getvalue()
-
-                    # Analyze
-                    analysis_result = analyze_image_sync(image_bytes)
+                    # Small RGB JPEG uploads are sent as-is instead of re-encoded
+                    if (
+                        image.format == "JPEG"
+                        and image.mode == "RGB"
+                        and max(image.size) <= ANALYSIS_MAX_DIM
+                    ):
+                        image_bytes = uploaded_file.getvalue()
+                    else:
+                        # Ensure RGB mode for JPEG (handle RGBA/P/LA modes)
+                        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+                            image = image.convert("RGBA").convert("RGB")
+                        elif image.mode != "RGB":
+                            image = image.convert("RGB")
+                        # Providers do not need more than ANALYSIS_MAX_DIM pixels
+                        image_bytes = image_to_jpeg_bytes(
+                            image, quality=75, max_dim=ANALYSIS_MAX_DIM
+                        )
+
+                    # Analyze; re-uploading the same file reuses the previous result
+                    analysis_result = analyze_image_sync(
+                        image_bytes,
+                        preferred_provider=st.session_state.get("ai_provider", "gemini"),
+                        image_key=hashlib.sha1(image_bytes).hexdigest(),
+                    )
 
                     # Save to history
                     st.session_state.analysis_history.append(
@@ -169,9 +169,15 @@ def _modern_stats_cards(theme: dict) -> None:
     # Get data (in real app, from database)
     history = st.session_state.get('analysis_history', [])
     total_scans = len(history)
-    avg_score = sum([r.get('health_score', 0) for r in history]) / max(total_scans, 1) if history else 85
-    safe_count = sum([1 for r in history if r.get('health_score', 0) > 70])
-    warnings = sum([len(r.get('warnings', [])) for r in history])
+    # Single pass over history for all three aggregates
+    score_total = safe_count = warnings = 0
+    for r in history:
+        score = r.get('health_score', 0)
+        score_total += score
+        if score > 70:
+            safe_count += 1
+        warnings += len(r.get('warnings', []))
+    avg_score = score_total / total_scans if history else 85
     
     stats = [
         {
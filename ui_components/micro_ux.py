@@ -7,9 +7,7 @@ from typing import List, Optional
 from contextlib import contextmanager
 
 
-def inject_skeleton_css() -> None:
-    """Inject CSS for skeleton loading animations (scoped to skeleton classes only)."""
-    css = """
+SKELETON_CSS = """
     <style>
         /* Skeleton loading animation */
         @keyframes skeleton-pulse {
@@ -109,7 +107,16 @@ def inject_skeleton_css() -> None:
         }
     </style>
     """
-    st.markdown(css, unsafe_allow_html=True)
+
+
+def inject_skeleton_css() -> None:
+    """
+    Inject CSS for skeleton loading animations (scoped to skeleton classes only).
+    
+    Call once near the top of each page; the component helpers rely on it
+    instead of injecting the stylesheet on every call.
+    """
+    st.markdown(SKELETON_CSS, unsafe_allow_html=True)
 
 
 def skeleton_card(height_px: int = 120, radius: int = 16) -> None:
@@ -218,8 +225,6 @@ def show_processing_status(
         active_step: Currently active step index
         show_spinner: Whether to show a spinner
     """
-    inject_skeleton_css()
-    
     if steps:
         step_progress(steps, active_step)
     
@@ -239,8 +244,6 @@ def skeleton_grid(columns: int = 3, rows: int = 2, card_height: int = 120) -> No
         rows: Number of rows in the grid
         card_height: Height of each card in pixels
     """
-    inject_skeleton_css()
-    
     for _ in range(rows):
         cols = st.columns(columns)
         for col in cols:
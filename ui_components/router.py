@@ -4,6 +4,10 @@ import streamlit as st
 
 PAGES = ["dashboard", "scan", "vault", "settings"]
 
+# Swipe neighbours per page, precomputed instead of PAGES.index() per call
+NEXT_PAGE = {page: PAGES[(i + 1) % len(PAGES)] for i, page in enumerate(PAGES)}
+PREV_PAGE = {page: PAGES[(i - 1) % len(PAGES)] for i, page in enumerate(PAGES)}
+
 
 def ensure_nav_state() -> None:
     """Initialize navigation-related session state keys."""
@@ -46,14 +50,10 @@ def go_back() -> None:
 def next_page() -> str:
     """Get the next page in sequence for swipe navigation."""
     ensure_nav_state()
-    current = st.session_state.get("current_page", "dashboard")
-    idx = PAGES.index(current) if current in PAGES else 0
-    return PAGES[(idx + 1) % len(PAGES)]
+    return NEXT_PAGE.get(st.session_state.get("current_page"), NEXT_PAGE[PAGES[0]])
 
 
 def prev_page() -> str:
     """Get the previous page in sequence for swipe navigation."""
     ensure_nav_state()
-    current = st.session_state.get("current_page", "dashboard")
-    idx = PAGES.index(current) if current in PAGES else 0
-    return PAGES[(idx - 1) % len(PAGES)]
+    return PREV_PAGE.get(st.session_state.get("current_page"), PREV_PAGE[PAGES[0]])
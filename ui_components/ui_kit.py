@@ -10,9 +10,7 @@ from contextlib import contextmanager
 BadgeKind = Literal["info", "success", "warning", "danger", "muted", "primary"]
 
 
-def inject_ui_kit_css() -> None:
-    """Inject UI Kit CSS (scoped to component classes only)."""
-    css = """
+UI_KIT_CSS = """
     <style>
         /* Badge components */
         .badge {
@@ -158,7 +156,16 @@ def inject_ui_kit_css() -> None:
         }
     </style>
     """
-    st.markdown(css, unsafe_allow_html=True)
+
+
+def inject_ui_kit_css() -> None:
+    """
+    Inject UI Kit CSS (scoped to component classes only).
+    
+    Call once near the top of each page; the component helpers rely on it
+    instead of injecting the stylesheet on every call.
+    """
+    st.markdown(UI_KIT_CSS, unsafe_allow_html=True)
 
 
 def badge(text: str, kind: BadgeKind = "info", icon: Optional[str] = None) -> str:
@@ -172,7 +179,6 @@ def badge(text: str, kind: BadgeKind = "info", icon: Optional[str] = None) -> st
     Returns:
         HTML string for the badge
     """
-    inject_ui_kit_css()
     icon_html = f'<span>{icon}</span>' if icon else ''
     return f'<span class="badge badge-{kind}">{icon_html}{text}</span>'
 
@@ -186,8 +192,6 @@ def metric(label: str, value: str, unit: str = "", delta: Optional[str] = None)
         unit: Optional unit (e.g., "g", "%", "kcal")
         delta: Optional delta/change indicator
     """
-    inject_ui_kit_css()
-    
     unit_html = f'<span class="metric-unit">{unit}</span>' if unit else ''
     delta_html = f'<div style="font-size: 12px; color: #10b981; margin-top: 4px;">{delta}</div>' if delta else ''
     
@@ -207,7 +211,6 @@ def section_title(text: str, icon: Optional[str] = None) -> None:
         text: Section title text
         icon: Optional emoji/icon
     """
-    inject_ui_kit_css()
     icon_html = f'{icon} ' if icon else ''
     st.markdown(f'<div class="section-title">{icon_html}{text}</div>', unsafe_allow_html=True)
 
@@ -219,8 +222,6 @@ def pills_row(items: list[str], interactive: bool = False) -> None:
         items: List of pill text items
         interactive: Whether pills should appear clickable (visual only)
     """
-    inject_ui_kit_css()
-    
     style_extra = 'cursor: pointer;' if interactive else ''
     pills_html = ''.join([
         f'<span class="pill" style="{style_extra}">{item}</span>'
@@ -242,8 +243,6 @@ def card(title: Optional[str] = None, icon: Optional[str] = None):
         with card(title="نتائج التحليل", icon="🔬"):
             st.write("Card content here")
     """
-    inject_ui_kit_css()
-    
     container = st.container()
     with container:
         if title:
@@ -267,8 +266,6 @@ def info_card(
         kind: Card style variant
         icon: Optional icon/emoji
     """
-    inject_ui_kit_css()
-    
     icon_html = f'{icon} ' if icon else ''
     
     st.markdown(f"""
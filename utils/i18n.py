@@ -254,7 +254,11 @@ def set_lang(lang: str) -> None:
     st.session_state.lang = "ar" if lang == "ar" else "en"
 
 
+def translate(key: str, lang: str) -> str:
+    """Translate key to the given language, falling back to English."""
+    return _STRINGS.get(lang, _STRINGS["en"]).get(key, _STRINGS["en"].get(key, key))
+
+
 def t(key: str) -> str:
     """Translate key to current language."""
-    lang = get_lang()
-    return _STRINGS.get(lang, _STRINGS["en"]).get(key, _STRINGS["en"].get(key, key))
+    return translate(key, get_lang())